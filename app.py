@@ -21,6 +21,7 @@ from src.components.charts import (
 )
 from src.components.filters import render_sidebar_filters
 from src.styles.dark_theme import apply_dark_theme
+from src.utils.helpers import format_duration
 from config.settings import APP_CONFIG
 
 # Configuração da página
@@ -123,12 +124,12 @@ def main_dashboard():
     
     # Carregar dados
     with st.spinner("📊 Carregando dados..."):
-        collector = DataCollector(client_data['planilha_id'])
+        collector = DataCollector.from_client_data(client_data)
         raw_data = collector.load_data()
         
         if raw_data is not None:
-            processor = DataProcessor()
-            df = processor.process_data(raw_data, filters)
+            processor = DataProcessor(scoring_rules=client_data.get('regras_score'))
+            df = processor.process_data(raw_data, filters, cache_key=collector.cache_key)
             
             if not df.empty:
                 # Salvar no cache
@@ -174,8 +175,16 @@ def main_dashboard():
                     
                     # Colunas a exibir
                     if show_all:
-                        display_cols = df.columns.tolist()
+                        # Todas as colunas da planilha (leitura sob demanda, fora do carregamento padrão)
+                        detail_collector = DataCollector.from_client_data(client_data, all_columns=True)
+                        detail_df = processor.process_data(
+                            detail_collector.load_data(),
+                            filters,
+                            cache_key=detail_collector.cache_key
+                        )
+                        display_cols = detail_df.columns.tolist()
                     else:
+                        detail_df = df
                         display_cols = [
                             'created_at', 'contact_name', 'channel', 'status',
                             'lead_stage', 'satisfaction_score', 'message_count',
@@ -185,13 +194,15 @@ def main_dashboard():
                     
                     # Exibir dados paginados
                     st.dataframe(
-                        df[display_cols].head(rows_per_page),
+                        detail_df[display_cols].head(rows_per_page),
                         use_container_width=True,
                         height=400
                     )
                     
                     # Download
-                    csv = df.to_csv(index=False)
+                    if not show_all:
+                        st.caption("Marque 'Mostrar todos os campos' para exportar todas as colunas da planilha")
+                    csv = detail_df.to_csv(index=False)
                     st.download_button(
                         label="📥 Download Completo (CSV)",
                         data=csv,
@@ -202,11 +213,13 @@ def main_dashboard():
                 # Footer com informações
                 st.markdown("---")
                 last_update = datetime.now(pytz.timezone('America/Sao_Paulo'))
+                snapshot_age = format_duration(collector.snapshot.age_seconds) if collector.snapshot else '-'
                 st.markdown(
                     f"""
                     <div style='text-align: center; color: #a3a8b8;'>
                         <small>
-                        Última atualização: {last_update.strftime('%d/%m/%Y %H:%M:%S')} | 
+                        Última atualização: {last_update.strftime('%d/%m/%Y %H:%M:%S')} 
+                        (dados coletados há {snapshot_age}) | 
                         Total de registros: {len(df):,} | 
                         Cliente: {client_data['client_id']}
                         </small>
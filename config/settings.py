@@ -18,7 +18,9 @@ APP_CONFIG = {
 CACHE_CONFIG = {
     'default_ttl': 300,  # 5 minutos em segundos
     'max_entries': 1000,
-    'clear_on_logout': True
+    'clear_on_logout': True,
+    'snapshot_max_bytes': 512 * 1024 * 1024,  # Orçamento do cache de snapshots (compartilhado entre sessões)
+    'enriched_max_bytes': 512 * 1024 * 1024  # Orçamento do cache de dados enriquecidos (score, etapa, sentimento)
 }
 
 # Configurações de autenticação
@@ -30,13 +32,95 @@ AUTH_CONFIG = {
     'min_token_length': 8
 }
 
+# Configurações da API Google (Sheets/Drive)
+GOOGLE_API_CONFIG = {
+    'scopes': [
+        'https://www.googleapis.com/auth/spreadsheets',
+        'https://www.googleapis.com/auth/drive'
+    ],
+    'client_pool_size': 4,  # Sessões HTTP keep-alive compartilhadas pelo processo
+    'http_pool_maxsize': 10,  # Conexões simultâneas por sessão
+    'token_refresh_margin': 300,  # segundos antes da expiração para renovar o token
+    'requests_per_minute': 60,  # Cota de leitura da API Sheets por usuário (service account)
+    'request_burst': 10,  # Requisições permitidas em rajada acima da taxa média
+    'max_retries': 5,  # Tentativas extras em 429/5xx
+    'backoff_base': 1.0,  # segundos (dobra a cada tentativa)
+    'backoff_max': 32.0,  # segundos
+    'retry_statuses': [429, 500, 502, 503, 504],
+    # Emulador local (fixtures em disco no lugar da API, para benchmarks sem rede)
+    'emulator_dir': os.getenv('SHEETS_EMULATOR_DIR', ''),
+    'emulator_latency': float(os.getenv('SHEETS_EMULATOR_LATENCY', '0')),  # segundos por requisição
+    'emulator_jitter': float(os.getenv('SHEETS_EMULATOR_JITTER', '0')),  # fração de variação da latência
+    'emulator_error_rate': float(os.getenv('SHEETS_EMULATOR_ERROR_RATE', '0'))  # probabilidade de erro 429/503
+}
+
 # Configurações de dados
 DATA_CONFIG = {
     'max_rows_display': 10000,
     'default_date_range_days': 30,
     'refresh_interval': 30,  # segundos
     'enable_auto_refresh': False,
-    'batch_size': 1000
+    'batch_size': 5000,  # Linhas por bloco na leitura em blocos
+    'streaming_ingest': True,  # Ler abas grandes em blocos, tipando cada bloco
+    'stream_min_rows': 20000,  # Linhas da aba a partir das quais a leitura é em blocos
+    'incremental_fetch': True,  # Ler apenas linhas novas das abas de conversas
+    'incremental_max_age': 3600,  # segundos até forçar recarga completa
+    'incremental_sample_rows': 20,  # Linhas anteriores conferidas a cada leitura incremental (detecta edições)
+    'incremental_check_column': 'status',  # Coluna relida inteira quando a planilha muda com linhas novas (edições fora da amostra)
+    'check_revision': True,  # Consultar a revisão da fonte antes de recarregar
+    'background_refresh': True,  # Renovar snapshots dos clientes ativos em segundo plano
+    'refresh_ahead_ratio': 0.8,  # Fração do TTL a partir da qual o snapshot é renovado
+    'refresher_tick': 15,  # segundos entre verificações do renovador
+    'tenant_idle_timeout': 900,  # segundos sem acesso até o cliente deixar de ser renovado
+    'max_parallel_fetches': 4,  # Abas/planilhas lidas ao mesmo tempo por cliente
+    # Colunas lidas pelo dashboard (demais colunas, como transcrições, só sob demanda)
+    'dashboard_columns': [
+        'conversation_id', 'created_at', 'data_contato',
+        'contact_name', 'nome_cliente', 'cliente_nome', 'contact_phone', 'telefone_cliente',
+        'channel', 'canal_origem', 'status', 'status_conversa', 'agent_id', 'agent_responsavel',
+        'resolved', 'escalated_to_human', 'message_count', 'satisfaction_score',
+        'first_response_time', 'resolution_time', 'frustration_level', 'nivel_frustracao',
+        'context_sentiment', 'mentions_product', 'mentions_price', 'mentions_quantity',
+        'lead_stage', 'lead_score', 'lead_qualified_date', 'lead_converted_date'
+    ],
+    'persist_snapshots': True,  # Snapshot colunar em disco para partidas a frio
+    'snapshot_dir': os.getenv('SNAPSHOT_DIR', '.snapshots'),
+    'snapshot_format': 'parquet',  # 'parquet' ou 'arrow' (Arrow IPC)
+    'local_data_dir': os.getenv('LOCAL_DATA_DIR', 'data')  # Base para fontes em arquivo (csv/parquet/jsonl)
+}
+
+# Regras do lead score (padrão; cada cliente pode definir as suas em `regras_score` na planilha mestre)
+# - faixas: {'column', 'tiers': [[operador, limite, pontos], ...]} - vale a primeira faixa atendida
+# - indicador: {'column', 'points'} - pontos quando o valor é verdadeiro
+# - lista: {'column', 'in': [...], 'points'} - pontos quando o valor está na lista
+LEAD_SCORING_CONFIG = {
+    'min_score': 0,
+    'max_score': 100,
+    'rules': [
+        {'column': 'message_count', 'tiers': [['>', 10, 20], ['>', 5, 10]]},  # Engajamento
+        {'column': 'satisfaction_score', 'tiers': [['>=', 4, 25], ['>=', 3, 10]]},  # Satisfação
+        {'column': 'resolved', 'points': 15},  # Resolução
+        {'column': 'first_response_time', 'tiers': [['<=', 60, 20], ['<=', 300, 10]]},  # Resposta rápida (s)
+        {'column': 'channel', 'in': ['whatsapp', 'telefone'], 'points': 10},  # Canais preferenciais
+        {'column': 'frustration_level', 'tiers': [['>', 3, -15]]},  # Penalização por frustração
+        {'column': 'mentions_product', 'points': 15},  # Menções a produtos/preços
+        {'column': 'mentions_price', 'points': 10},
+        {'column': 'mentions_quantity', 'points': 5}
+    ],
+    # Transições de etapa do lead (convertido e perdido são mantidos)
+    'stages': {
+        'convert_score': 70,  # Score mínimo (com conversa resolvida) para convertido
+        'qualify_score': 50,  # Score mínimo para qualificado
+        'lost_score': 20,  # Score abaixo do qual, com frustração alta, o lead é perdido
+        'lost_frustration': 4  # Frustração acima da qual o lead de score baixo é perdido
+    },
+    # Lead quente: score alto com sinal de interesse, ou score muito alto
+    'hot_lead': {
+        'min_score': 60,
+        'min_messages': 8,  # Mais mensagens que isso conta como interesse
+        'min_satisfaction': 4,
+        'always_hot_score': 80
+    }
 }
 
 # Configurações de visualização
@@ -6,9 +6,17 @@ Adiciona as colunas necessárias para o funil de conversão
 
 import gspread
 from google.oauth2.service_account import Credentials
+import os
 import sys
 from datetime import datetime
 
+# Permite importar o pacote src ao executar o script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.worksheets import worksheet_resolver
+from src.utils.google_client import QuotaHTTPClient
+from src.utils.sheets_emulator import create_emulated_client
+
 # Configurações
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
@@ -26,34 +34,31 @@ def add_lead_columns(sheet_id: str, credentials_path: str = None):
     print(f"🚀 Adicionando colunas de lead tracking na planilha: {sheet_id}")
     
     try:
-        # Autenticar
-        if credentials_path:
-            creds = Credentials.from_service_account_file(credentials_path, scopes=SCOPES)
-        else:
-            # Usar secrets do Streamlit
-            import streamlit as st
-            creds_dict = dict(st.secrets['GOOGLE_CREDENTIALS'])
-            creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-        
-        client = gspread.authorize(creds)
-        
-        # Abrir planilha
-        sheet = client.open_by_key(sheet_id)
-        
-        # Procurar aba Contatos ou similar
-        worksheet = None
-        for ws_name in ['Contatos', 'Contacts', 'Conversas', 'Sheet1']:
-            try:
-                worksheet = sheet.worksheet(ws_name)
-                print(f"✅ Aba '{ws_name}' encontrada")
-                break
-            except:
-                continue
+        # Emulador local (SHEETS_EMULATOR_DIR) no lugar da API, se configurado
+        client = create_emulated_client()
+
+        if client is None:
+            # Autenticar
+            if credentials_path:
+                creds = Credentials.from_service_account_file(credentials_path, scopes=SCOPES)
+            else:
+                # Usar secrets do Streamlit
+                import streamlit as st
+                creds_dict = dict(st.secrets['GOOGLE_CREDENTIALS'])
+                creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+
+            # Requisições passam pelo agendador de cota (limite de taxa e backoff em 429/5xx)
+            client = gspread.authorize(creds, http_client=QuotaHTTPClient)
+        
+        # Procurar aba Contatos ou similar (uma leitura de metadados)
+        worksheet = worksheet_resolver.resolve(client, sheet_id)
         
         if not worksheet:
             print("❌ Nenhuma aba de dados encontrada")
             return False
         
+        print(f"✅ Aba '{worksheet.title}' encontrada")
+        
         # Obter headers atuais
         current_headers = worksheet.row_values(1)
         if not current_headers:
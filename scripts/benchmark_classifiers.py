@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos classificadores de lead quente e sentimento
+Compara os df.apply linha a linha originais com as máscaras de src/data/classifiers.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Permite importar o pacote src ao executar o script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.benchmark_scoring import generate_frame
+from src.data.classifiers import detect_hot_leads, classify_sentiment
+from src.data.scoring import compute_lead_score
+
+def legacy_is_hot_lead(row):
+    """Implementação original de DataProcessor._detect_hot_leads (referência)"""
+    score = row.get('lead_score', 0)
+    messages = row.get('message_count', 0)
+    satisfaction = row.get('satisfaction_score', 0)
+    mentions_product = row.get('mentions_product', False)
+    mentions_price = row.get('mentions_price', False)
+
+    if score >= 60:
+        if messages > 8 or satisfaction >= 4 or (mentions_product and mentions_price):
+            return True
+
+    if score >= 80:
+        return True
+
+    return False
+
+def legacy_analyze_sentiment(row):
+    """Implementação original de DataProcessor._analyze_sentiment (referência)"""
+    frustration = row.get('frustration_level', 0)
+    satisfaction = row.get('satisfaction_score', 3)
+    resolved = row.get('resolved', False)
+    escalated = row.get('escalated_to_human', False)
+
+    if pd.notna(row.get('context_sentiment')):
+        return row['context_sentiment']
+
+    try:
+        frustration = float(frustration) if pd.notna(frustration) else 0
+        satisfaction = float(satisfaction) if pd.notna(satisfaction) else 3
+
+        if frustration > 3 or escalated:
+            return 'negative'
+        elif satisfaction >= 4 and resolved:
+            return 'positive'
+        elif satisfaction <= 2:
+            return 'negative'
+        else:
+            return 'neutral'
+    except:
+        return 'neutral'
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    print(f"{'linhas':>10} | {'classificador':>13} | {'apply (s)':>10} | {'máscaras (s)':>12} | {'ganho':>7}")
+    print("-" * 66)
+
+    for n_rows in sizes:
+        df = generate_frame(n_rows)
+        df['escalated_to_human'] = np.random.default_rng(7).random(n_rows) < 0.1
+        df['lead_score'] = compute_lead_score(df)
+
+        # Os originais rodavam com message_count em float (vazio = NaN); o Int64
+        # anulável atual quebraria a comparação com pd.NA, então eles recebem a
+        # coluna nesse formato (conversão fora da medição)
+        legacy_df = df.assign(message_count=df['message_count'].astype('float64'))
+
+        cases = [
+            ('lead quente', legacy_is_hot_lead, detect_hot_leads),
+            ('sentimento', legacy_analyze_sentiment, classify_sentiment)
+        ]
+        for name, legacy, vectorized in cases:
+            # O original é lento demais para repetir: uma execução, usada também na conferência
+            expected, legacy_time = timed(lambda: legacy_df.apply(legacy, axis=1))
+            result, vector_time = timed(lambda: vectorized(df))
+            assert (expected.to_numpy() == result.to_numpy()).all(), f"Resultados divergentes ({name})"
+
+            print(f"{n_rows:>10,} | {name:>13} | {legacy_time:>10.3f} | {vector_time:>12.4f} | {legacy_time / vector_time:>6.0f}x")
+
+if __name__ == "__main__":
+    main()
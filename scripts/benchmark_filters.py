@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos filtros da barra lateral
+Compara DataProcessor.filter_and_sort por máscaras (sem índice) e pelo índice de
+src/data/filter_index.py (período por busca binária no DataFrame ordenado pela data).
+Os dois lados devolvem o DataFrame filtrado pronto, então o tempo inclui montar o resultado.
+"""
+
+import logging
+import os
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Permite importar o pacote src ao executar o script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.benchmark_scoring import generate_frame
+from src.data.filter_index import FilterIndex
+from src.data.processors import DataProcessor
+
+# Combinações típicas, da mais ampla à mais restrita
+FILTER_CASES = [
+    ('últimos 7 dias', {'date_start': pd.Timestamp.now().date() - timedelta(days=7)}),
+    ('só período', {}),
+    ('canal', {'channel': 'WhatsApp'}),
+    ('canal+status+etapa', {'channel': 'WhatsApp', 'status': 'Resolvido', 'lead_stage': 'Qualificado'}),
+    ('todos', {'channel': 'Email', 'status': 'Não Resolvido', 'lead_stage': 'Novo',
+               'satisfaction': 'Baixa (1-2)', 'agent': 'agente_3', 'min_messages': 5, 'max_frustration': 4})
+]
+
+def enriched_frame(n_rows: int) -> pd.DataFrame:
+    """Dados sintéticos (dois anos de histórico) já enriquecidos pelo DataProcessor"""
+    rng = np.random.default_rng(11)
+    df = generate_frame(n_rows)
+    df['created_at'] = pd.Timestamp.now().normalize() - pd.to_timedelta(rng.integers(0, 730 * 86400, n_rows), unit='s')
+    df['agent_id'] = pd.Categorical(rng.choice([f'agente_{i}' for i in range(20)], n_rows))
+    # Mesma ordem do DataFrame guardado no cache (data mais recente primeiro)
+    return DataProcessor().enrich(df).sort_values('created_at', ascending=False, kind='stable')
+
+def timed(func, repeat: int = 5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    logging.disable(logging.INFO)
+    processor = DataProcessor()
+    today = pd.Timestamp.now().date()
+
+    print(f"{'linhas':>10} | {'filtros':>18} | {'máscaras (s)':>12} | {'índice (s)':>10} | {'ganho':>6}")
+    print("-" * 70)
+
+    for n_rows in sizes:
+        df = enriched_frame(n_rows)
+        index, build_time = timed(lambda: FilterIndex(df), repeat=1)
+
+        for name, case in FILTER_CASES:
+            filters = {'date_start': today - timedelta(days=30), 'date_end': today, **case}
+            expected, mask_time = timed(lambda: processor.filter_and_sort(df, filters))
+            result, index_time = timed(lambda: processor.filter_and_sort(df, filters, index))
+            assert expected.index.equals(result.index), f"Resultados divergentes ({name})"
+
+            print(f"{n_rows:>10,} | {name:>18} | {mask_time:>12.4f} | {index_time:>10.4f} | {mask_time / index_time:>5.1f}x")
+
+        print(f"{'':>10} | {'montagem do índice':>18} | {'':>12} | {build_time:>10.4f} |")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória por rerun do dashboard
+Compara o pico de RSS do fluxo antigo (cópias defensivas, enriquecimento e filtros
+encadeados a cada rerun) com o atual (Copy-on-Write, dados enriquecidos em cache e
+uma única seleção de linhas). Cada fluxo roda em um processo separado.
+
+Uso: python scripts/benchmark_memory.py [linhas] [reruns]
+"""
+
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Permite importar o pacote src ao executar o script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.benchmark_scoring import generate_frame
+from src.data.processors import DataProcessor
+
+# Sequência de filtros de uma sessão típica (um rerun por mudança na barra lateral)
+TODAY = pd.Timestamp.now().date()
+FILTER_SEQUENCE = [
+    {'date_start': TODAY - timedelta(days=30), 'date_end': TODAY},
+    {'date_start': TODAY - timedelta(days=30), 'date_end': TODAY, 'channel': 'WhatsApp'},
+    {'date_start': TODAY - timedelta(days=7), 'date_end': TODAY, 'channel': 'WhatsApp'},
+    {'date_start': TODAY - timedelta(days=7), 'date_end': TODAY, 'status': 'Resolvido'},
+    {'date_start': TODAY - timedelta(days=365), 'date_end': TODAY, 'satisfaction': 'Alta (4-5)'}
+]
+
+def raw_frame(n_rows: int) -> pd.DataFrame:
+    """Dados sintéticos com dois anos de histórico"""
+    rng = np.random.default_rng(13)
+    df = generate_frame(n_rows)
+    df['created_at'] = pd.Timestamp.now().normalize() - pd.to_timedelta(rng.integers(0, 730 * 86400, n_rows), unit='s')
+    df['contact_name'] = pd.Series([f'Contato {i}' for i in range(n_rows)], dtype=object)
+    return df
+
+def weekly_messages(df: pd.DataFrame, mutate: bool) -> pd.DataFrame:
+    """Agrupamento do gráfico semanal (mutate=True reproduz as colunas auxiliares antigas)"""
+    if mutate:
+        df['week'] = df['created_at'].dt.isocalendar().week
+        df['year'] = df['created_at'].dt.year
+        return df.groupby(['year', 'week'])['message_count'].sum().reset_index()
+
+    year = df['created_at'].dt.year.rename('year')
+    week = df['created_at'].dt.isocalendar().week.rename('week')
+    return df.groupby([year, week])['message_count'].sum().reset_index()
+
+def legacy_apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Filtros como eram: cópia e um DataFrame intermediário por filtro (referência)"""
+    filtered_df = df.copy()
+
+    start_date = pd.Timestamp(filters['date_start'])
+    end_date = pd.Timestamp(filters['date_end']) + timedelta(days=1)
+    filtered_df = filtered_df[(filtered_df['created_at'] >= start_date) & (filtered_df['created_at'] < end_date)]
+
+    if filters.get('channel'):
+        filtered_df = filtered_df[filtered_df['channel'] == filters['channel'].lower()]
+    if filters.get('status'):
+        filtered_df = filtered_df[filtered_df['status'] == 'RESOLVED']
+    if filters.get('satisfaction'):
+        filtered_df = filtered_df[filtered_df['satisfaction_score'] >= 4]
+
+    return filtered_df
+
+def legacy_rerun(processor: DataProcessor, raw: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Rerun como era: cópia profunda, enriquecimento completo, filtros encadeados e ordenação"""
+    df = raw.copy()
+    for step in (processor._standardize_columns, processor._calculate_metrics, processor._apply_lead_scoring,
+                 processor._detect_hot_leads, processor._analyze_sentiment):
+        df = step(df)
+    df = legacy_apply_filters(df, filters)
+    df = df.sort_values('created_at', ascending=False)
+    weekly_messages(df, mutate=True)
+    return df
+
+def current_rerun(processor: DataProcessor, raw: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Rerun atual: enriquecimento em cache, índice de filtros e gráficos sem efeitos colaterais"""
+    df = processor.process_data(raw, filters, cache_key='benchmark')
+    weekly_messages(df, mutate=False)
+    return df
+
+def _status_kb(field: str) -> int:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+def _reset_peak() -> bool:
+    """Zera o pico de RSS do processo (Linux: /proc/self/clear_refs)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+def run_mode(mode: str, n_rows: int, reruns: int):
+    """Executa os reruns de um fluxo e imprime RSS base, pico e tempo de cada um"""
+    import logging
+    logging.disable(logging.INFO)
+
+    raw = raw_frame(n_rows)
+    processor = DataProcessor()
+    rerun = legacy_rerun if mode == 'antes' else current_rerun
+    result = None  # Como st.session_state.df_cache: o resultado do rerun anterior fica vivo
+
+    for number in range(reruns):
+        filters = FILTER_SEQUENCE[number % len(FILTER_SEQUENCE)]
+        base = _status_kb('VmRSS:')
+        if not _reset_peak():
+            print("Sem /proc/self/clear_refs: o pico por rerun requer Linux")
+            return
+
+        start = time.perf_counter()
+        result = rerun(processor, raw, filters)
+        elapsed = time.perf_counter() - start
+
+        peak = _status_kb('VmHWM:')
+        print(f"{mode:>6} | {number + 1:>5} | {base / 1024:>9.1f} | {peak / 1024:>9.1f} | "
+              f"{(peak - base) / 1024:>10.1f} | {elapsed:>8.3f} | {len(result):>9,}", flush=True)
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        run_mode(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else len(FILTER_SEQUENCE) * 2
+
+    print(f"{n_rows:,} linhas, {reruns} reruns por fluxo")
+    print(f"{'fluxo':>6} | {'rerun':>5} | {'base (MB)':>9} | {'pico (MB)':>9} | {'extra (MB)':>10} | {'tempo (s)':>8} | {'linhas':>9}")
+    print("-" * 75)
+    for mode in ('antes', 'depois'):
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode, str(n_rows), str(reruns)], check=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark do lead score
+Compara o df.apply linha a linha original com a versão em coluna de src/data/scoring.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Permite importar o pacote src ao executar o script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.schema import apply_schema
+from src.data.scoring import compute_lead_score
+
+def legacy_lead_score(row):
+    """Implementação original de DataProcessor._apply_lead_scoring (referência)"""
+    score = 0
+
+    if pd.notna(row.get('message_count', 0)):
+        if row['message_count'] > 10:
+            score += 20
+        elif row['message_count'] > 5:
+            score += 10
+
+    if pd.notna(row.get('satisfaction_score', 0)):
+        if row['satisfaction_score'] >= 4:
+            score += 25
+        elif row['satisfaction_score'] >= 3:
+            score += 10
+
+    if row.get('resolved', False):
+        score += 15
+
+    if pd.notna(row.get('first_response_time', 0)):
+        if row['first_response_time'] <= 60:
+            score += 20
+        elif row['first_response_time'] <= 300:
+            score += 10
+
+    preferred_channels = ['whatsapp', 'telefone']
+    if row.get('channel', '') in preferred_channels:
+        score += 10
+
+    if pd.notna(row.get('frustration_level', 0)):
+        try:
+            frustration = float(row['frustration_level'])
+            if frustration > 3:
+                score -= 15
+        except:
+            pass
+
+    if row.get('mentions_product', False):
+        score += 15
+    if row.get('mentions_price', False):
+        score += 10
+    if row.get('mentions_quantity', False):
+        score += 5
+
+    return min(100, max(0, score))
+
+def generate_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """DataFrame tipado como na ingestão, com vazios em todas as colunas numéricas"""
+    rng = np.random.default_rng(seed)
+
+    def maybe_blank(values, rate=0.1):
+        values = values.astype(str).astype(object)
+        values[rng.random(n_rows) < rate] = ''
+        return values
+
+    raw = pd.DataFrame({
+        'conversation_id': np.arange(n_rows).astype(str),
+        'channel': rng.choice(['whatsapp', 'telefone', 'email', 'chat online', 'nan'], n_rows),
+        'message_count': maybe_blank(rng.integers(0, 20, n_rows)),
+        'satisfaction_score': maybe_blank(rng.integers(1, 6, n_rows)),
+        'first_response_time': maybe_blank(rng.integers(0, 900, n_rows)),
+        'frustration_level': maybe_blank(rng.integers(0, 6, n_rows)),
+        'resolved': rng.choice(['sim', 'não', ''], n_rows),
+        'mentions_product': rng.choice(['true', 'false'], n_rows),
+        'mentions_price': rng.choice(['true', 'false'], n_rows),
+        'mentions_quantity': rng.choice(['1', '0', ''], n_rows)
+    }, dtype=object)
+    return apply_schema(raw)
+
+def best_time(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+
+    print(f"{'linhas':>10} | {'apply (s)':>10} | {'colunas (s)':>11} | {'ganho':>7}")
+    print("-" * 48)
+
+    for n_rows in sizes:
+        df = generate_frame(n_rows)
+
+        expected = df.apply(legacy_lead_score, axis=1)
+        result = compute_lead_score(df)
+        assert (expected.to_numpy() == result.to_numpy()).all(), "Resultados divergentes"
+
+        legacy_time = best_time(lambda: df.apply(legacy_lead_score, axis=1), repeat=1)
+        vector_time = best_time(lambda: compute_lead_score(df))
+
+        print(f"{n_rows:>10,} | {legacy_time:>10.3f} | {vector_time:>11.4f} | {legacy_time / vector_time:>6.0f}x")
+
+if __name__ == "__main__":
+    main()
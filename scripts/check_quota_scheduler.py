@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Verificação do agendador de cota com relógio falso
+Roda o QuotaScheduler de src/utils/quota.py sem esperar de verdade: o relógio só
+avança quando o agendador dorme. Confere o rodízio entre clientes, a prioridade
+da fila interativa, o esvaziamento do balde após 429 (erros do emulador local) e
+que execuções com parâmetros sorteados sempre terminam.
+
+Uso: python scripts/check_quota_scheduler.py [execuções sorteadas]
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+# Permite importar o pacote src ao executar o script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.quota import QuotaScheduler, INTERACTIVE, BACKGROUND
+from src.utils.sheets_emulator import _api_error
+
+class FakeClock:
+    """Relógio falso: o tempo só avança quando alguém dorme"""
+
+    def __init__(self, start: float = 1000.0, max_sleeps: int = 10_000):
+        """
+        Args:
+            start: Leitura inicial do relógio
+            max_sleeps: Esperas permitidas antes de considerar o agendador travado
+        """
+        self.now = start
+        self.sleeps = 0
+        self.max_sleeps = max_sleeps
+        self.gate = threading.Event()  # Fechado: quem dorme fica parado até a liberação
+        self.gate.set()
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds: float):
+        self.gate.wait()
+        with self._lock:
+            self.sleeps += 1
+            if self.sleeps > self.max_sleeps:
+                raise RuntimeError(f"Agendador travado: {self.sleeps} esperas (última de {seconds!r}s)")
+            self.now += seconds
+
+class NoJitter(random.Random):
+    """Jitter zerado: o backoff fica em metade da espera exponencial"""
+
+    def random(self) -> float:
+        return 0.0
+
+def new_scheduler(clock: FakeClock, rng: random.Random = None, **kwargs) -> QuotaScheduler:
+    options = dict(requests_per_minute=60, burst=1, backoff_base=2.0)
+    options.update(kwargs)
+    return QuotaScheduler(clock=clock, sleep=clock.sleep, rng=rng or NoJitter(), **options)
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Tempo esgotado aguardando o agendador")
+        time.sleep(0.001)
+
+def served_order(calls):
+    """
+    Enfileira as chamadas (cliente, prioridade) uma a uma com o balde vazio e
+    a fila parada, libera o relógio e devolve a ordem de atendimento
+    """
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    scheduler.bucket.drain(1.0)  # A primeira da fila espera a ficha (e segura as demais)
+    clock.gate.clear()
+
+    order = []
+    threads = []
+    for number, (tenant, priority) in enumerate(calls, start=1):
+        thread = threading.Thread(
+            target=scheduler.call, args=(order.append, f"{tenant}/{priority}"),
+            kwargs={'tenant': tenant, 'priority': priority}, daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: sum(scheduler.get_stats()['waiting'].values()) == number)
+
+    clock.gate.set()
+    for thread in threads:
+        thread.join(timeout=5.0)
+        assert not thread.is_alive(), "Agendador travado"
+    return order
+
+def check_round_robin():
+    """Clientes da mesma fila se alternam, na ordem de chegada"""
+    calls = [('a', INTERACTIVE)] * 3 + [('b', INTERACTIVE)] * 3
+    order = served_order(calls)
+    expected = ['a/interactive', 'b/interactive'] * 3
+    assert order == expected, f"Rodízio incorreto: {order}"
+
+def check_priority():
+    """Fila interativa é atendida antes da de segundo plano, mesmo chegando depois"""
+    calls = [('a', BACKGROUND), ('a', BACKGROUND), ('b', BACKGROUND), ('c', INTERACTIVE), ('c', INTERACTIVE)]
+    order = served_order(calls)
+    expected = ['c/interactive', 'c/interactive', 'a/background', 'b/background', 'a/background']
+    assert order == expected, f"Prioridade incorreta: {order}"
+
+def check_throttled_drain():
+    """429 esvazia o balde: a nova tentativa e o próximo cliente esperam backoff + uma ficha"""
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    attempts = []
+
+    def flaky():
+        attempts.append(clock())
+        if len(attempts) <= 2:
+            raise _api_error(429, "Cota excedida (simulada)")
+        return 'ok'
+
+    assert scheduler.call(flaky, tenant='a') == 'ok'
+    served_at = []
+    scheduler.call(lambda: served_at.append(clock()), tenant='b')
+
+    # Backoff de 1s e 2s (sem jitter), cada um seguido de 1s até a próxima ficha
+    assert attempts == [1000.0, 1002.0, 1005.0], f"Tentativas fora do esperado: {attempts}"
+    assert served_at == [1006.0], f"Outro cliente não esperou o balde: {served_at}"
+    stats = scheduler.get_stats()
+    assert (stats['throttled'], stats['retries'], stats['requests']) == (2, 2, 4), stats
+
+def check_seeded_runs(runs: int):
+    """Parâmetros, relógio e erros sorteados: toda execução termina"""
+    for seed in range(runs):
+        rng = random.Random(seed)
+        clock = FakeClock(start=rng.uniform(0, 1e6))
+        scheduler = new_scheduler(
+            clock, rng=random.Random(seed),
+            requests_per_minute=rng.choice([7, 60, 100, 300, 1000]),
+            burst=rng.randint(1, 10), backoff_base=rng.uniform(0.1, 2.0)
+        )
+
+        def request():
+            if rng.random() < 0.2:
+                raise _api_error(rng.choice([429, 503]), "Erro sorteado")
+
+        for _ in range(50):
+            try:
+                scheduler.call(request, tenant=rng.choice('abc'), priority=rng.choice([INTERACTIVE, BACKGROUND]))
+            except RuntimeError as e:
+                raise AssertionError(f"Semente {seed}: {e}")
+            except Exception:
+                pass  # Erro que esgotou as tentativas
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    logging.disable(logging.WARNING)  # Avisos de nova tentativa das falhas simuladas
+
+    checks = [
+        ('rodízio entre clientes', check_round_robin),
+        ('prioridade interativa', check_priority),
+        ('429 esvazia o balde', check_throttled_drain),
+        (f'{runs} execuções sorteadas', lambda: check_seeded_runs(runs))
+    ]
+    for name, check in checks:
+        check()
+        print(f"ok - {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Grava planilhas reais como fixtures do emulador local do Google Sheets
+Depois é só apontar SHEETS_EMULATOR_DIR para o diretório gravado e rodar o dashboard sem rede
+"""
+
+import argparse
+import os
+import sys
+
+import gspread
+from google.oauth2.service_account import Credentials
+
+# Permite importar o pacote src ao executar o script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import GOOGLE_API_CONFIG
+from src.data.sources import split_list
+from src.utils.google_client import QuotaHTTPClient
+from src.utils.sheets_emulator import record_spreadsheet
+
+def client_sheet_ids(client, master_sheet_id: str):
+    """IDs das planilhas de dados dos clientes ativos cadastrados na planilha mestre"""
+    rows = client.open_by_key(master_sheet_id).get_worksheet(0).get_all_values()
+    if len(rows) < 2:
+        return []
+
+    headers = rows[0]
+    sheet_ids = []
+    for values in rows[1:]:
+        row = dict(zip(headers, values))
+        if row.get('ativo', '').upper() != 'TRUE':
+            continue
+        if (row.get('fonte_dados') or 'sheets') != 'sheets':
+            continue
+        sheet_ids.extend(split_list(row.get('caminho_dados')) or [row.get('planilha_id', '')])
+
+    return [sheet_id for sheet_id in dict.fromkeys(sheet_ids) if sheet_id]
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava planilhas como fixtures do emulador")
+    parser.add_argument('fixtures_dir', help="Diretório de destino das fixtures")
+    parser.add_argument('sheet_ids', nargs='*', help="IDs das planilhas a gravar")
+    parser.add_argument('--credentials', help="Arquivo JSON da service account (padrão: secrets do Streamlit)")
+    parser.add_argument('--master', help="Planilha mestre: grava ela e as planilhas dos clientes ativos")
+    args = parser.parse_args()
+
+    if args.credentials:
+        creds = Credentials.from_service_account_file(args.credentials, scopes=GOOGLE_API_CONFIG['scopes'])
+    else:
+        import streamlit as st
+        creds = Credentials.from_service_account_info(
+            dict(st.secrets['GOOGLE_CREDENTIALS']), scopes=GOOGLE_API_CONFIG['scopes']
+        )
+
+    # Requisições passam pelo agendador de cota (limite de taxa e backoff em 429/5xx)
+    client = gspread.authorize(creds, http_client=QuotaHTTPClient)
+
+    sheet_ids = list(args.sheet_ids)
+    if args.master:
+        sheet_ids = [args.master] + client_sheet_ids(client, args.master) + sheet_ids
+
+    if not sheet_ids:
+        parser.error("informe IDs de planilhas ou --master")
+
+    sheet_ids = list(dict.fromkeys(sheet_ids))
+    failed = 0
+    for sheet_id in sheet_ids:
+        try:
+            path = record_spreadsheet(client, sheet_id, args.fixtures_dir)
+            print(f"✅ {sheet_id} -> {path}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {sheet_id}: {e}")
+
+    print(f"\n📦 {len(sheet_ids) - failed} planilhas gravadas em {args.fixtures_dir}")
+    if args.master:
+        print(f"▶️  SHEETS_EMULATOR_DIR={args.fixtures_dir} streamlit run app.py (MASTER_SHEET_ID = {args.master} nos secrets)")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 
+from src.data.scoring import STAGE_RULES
+
 # Cores do tema
 COLORS = {
     'primary': '#3498db',
@@ -125,6 +127,20 @@ def render_funnel_chart(df: pd.DataFrame):
         if taxa_conv_qualificados < 40:
             st.warning("⚠️ Conversão de qualificados pode melhorar. Revisar processo de vendas.")
 
+    # Critério que definiu a etapa de cada lead (calculado junto com a etapa)
+    if 'lead_stage_rule' in df.columns and total_leads > 0:
+        with st.expander("🔎 Por que cada lead está nesta etapa"):
+            # Coluna categórica: sem os critérios que não definiram nenhum lead
+            rule_counts = df['lead_stage_rule'].value_counts(sort=False).loc[lambda counts: counts > 0]
+            st.dataframe(
+                pd.DataFrame({
+                    'Critério': [STAGE_RULES.get(rule, rule) for rule in rule_counts.index],
+                    'Leads': rule_counts.to_numpy()
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+
 def render_timeline_chart(df: pd.DataFrame):
     """Renderiza gráfico de evolução temporal"""
     st.subheader("📈 Evolução de Contatos - Dezembro 2024")
@@ -134,13 +150,10 @@ def render_timeline_chart(df: pd.DataFrame):
         return
     
     try:
-        # Garantir datetime
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        
         # Agrupar por dia
         daily_stats = df.groupby(df['created_at'].dt.date).agg({
             'conversation_id': 'count',
-            'resolved': lambda x: x.astype(str).str.lower().isin(['true', '1', 'sim']).sum()
+            'resolved': 'sum'
         }).reset_index()
         
         daily_stats.columns = ['Data', 'Total', 'Resolvidos']
@@ -191,8 +204,9 @@ def render_channel_chart(df: pd.DataFrame):
         st.warning("Dados de canal não disponíveis")
         return
     
-    # Contar por canal
+    # Contar por canal (sem as categorias que ficaram vazias após os filtros)
     channel_counts = df['channel'].value_counts()
+    channel_counts = channel_counts[channel_counts > 0]
     
     # Definir cores por canal
     channel_colors = {
@@ -234,10 +248,6 @@ def render_messages_chart(df: pd.DataFrame, filters: dict):
         return
     
     try:
-        # Garantir tipos corretos
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        df['message_count'] = pd.to_numeric(df['message_count'], errors='coerce').fillna(0)
-        
         # Seletor de período
         period_option = st.radio(
             "Agrupar por:",
@@ -250,9 +260,10 @@ def render_messages_chart(df: pd.DataFrame, filters: dict):
             grouped = df.groupby(df['created_at'].dt.date)['message_count'].sum().reset_index()
             grouped.columns = ['Período', 'Total de Mensagens']
         elif period_option == "Semana":
-            df['week'] = df['created_at'].dt.isocalendar().week
-            df['year'] = df['created_at'].dt.year
-            grouped = df.groupby(['year', 'week'])['message_count'].sum().reset_index()
+            # Chaves de agrupamento como séries: o DataFrame recebido não é alterado
+            year = df['created_at'].dt.year.rename('year')
+            week = df['created_at'].dt.isocalendar().week.rename('week')
+            grouped = df.groupby([year, week])['message_count'].sum().reset_index()
             grouped['Período'] = 'Sem ' + grouped['week'].astype(str) + '/' + grouped['year'].astype(str)
             grouped = grouped[['Período', 'message_count']]
             grouped.columns = ['Período', 'Total de Mensagens']
@@ -302,7 +313,7 @@ def render_messages_chart(df: pd.DataFrame, filters: dict):
             # Distribuição por canal se disponível
             if 'channel' in df.columns:
                 st.markdown("### 📱 Por Canal")
-                channel_msgs = df.groupby('channel')['message_count'].sum().sort_values(ascending=False)
+                channel_msgs = df.groupby('channel', observed=True)['message_count'].sum().sort_values(ascending=False)
                 for channel, count in channel_msgs.head(3).items():
                     st.write(f"**{channel}**: {int(count):,} msgs")
         
@@ -326,13 +337,14 @@ def render_agent_performance(df: pd.DataFrame):
         })
     else:
         # Usar dados reais
-        agents_data = df.groupby('agent_id').agg({
+        agents_data = df.groupby('agent_id', observed=True).agg({
             'conversation_id': 'count',
-            'resolved': lambda x: (x.astype(str).str.lower().isin(['true', '1', 'sim']).sum() / len(x) * 100) if len(x) > 0 else 0,
-            'satisfaction_score': lambda x: pd.to_numeric(x, errors='coerce').mean()
+            'resolved': 'mean',
+            'satisfaction_score': 'mean'
         }).reset_index()
         
         agents_data.columns = ['Atendente', 'Total Atendimentos', 'Taxa Resolução', 'Satisfação Média']
+        agents_data['Taxa Resolução'] = agents_data['Taxa Resolução'] * 100
         agents_data = agents_data.sort_values('Total Atendimentos', ascending=False)
     
     # Criar gráfico de barras horizontais
@@ -5,8 +5,12 @@ Gerencia todos os filtros disponíveis no dashboard
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta, date
 
+from src.data.collectors import invalidate_snapshots
+from src.utils.auth import get_current_sheet_id
+
 def render_sidebar_filters() -> dict:
     """
     Renderiza todos os filtros na sidebar
@@ -181,8 +185,9 @@ def render_sidebar_filters() -> dict:
     
     # Botão de atualização manual
     if st.sidebar.button("🔄 Atualizar Agora", use_container_width=True):
-        # Limpar cache
+        # Limpar cache (apenas os snapshots do cliente atual)
         st.cache_data.clear()
+        invalidate_snapshots(get_current_sheet_id())
         if 'df_cache' in st.session_state:
             del st.session_state['df_cache']
         st.rerun()
@@ -203,8 +208,11 @@ def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
     """
     Aplica filtros ao DataFrame
     
+    As condições são combinadas em uma máscara e as linhas são selecionadas
+    uma única vez (sem cópia do DataFrame a cada filtro).
+    
     Args:
-        df: DataFrame original
+        df: DataFrame original (não é alterado)
         filters: Dict com filtros selecionados
         
     Returns:
@@ -213,24 +221,26 @@ def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
     if df.empty:
         return df
     
-    df_filtered = df.copy()
+    mask = np.ones(len(df), dtype=bool)
+    
+    def keep(condition: pd.Series):
+        """Restringe a máscara (vazios não passam)"""
+        np.logical_and(mask, condition.to_numpy(dtype=bool, na_value=False), out=mask)
     
     # Filtro de data
-    if 'created_at' in df_filtered.columns and 'date_start' in filters and 'date_end' in filters:
+    if 'created_at' in df.columns and 'date_start' in filters and 'date_end' in filters:
         try:
-            df_filtered['created_at'] = pd.to_datetime(df_filtered['created_at'])
-            mask = (df_filtered['created_at'].dt.date >= filters['date_start']) & \
-                   (df_filtered['created_at'].dt.date <= filters['date_end'])
-            df_filtered = df_filtered[mask]
+            created_date = df['created_at'].dt.date
+            keep((created_date >= filters['date_start']) & (created_date <= filters['date_end']))
         except:
             st.warning("⚠️ Erro ao filtrar por data")
     
     # Filtro de canal
-    if filters.get('channel') and filters['channel'] != 'Todos' and 'channel' in df_filtered.columns:
-        df_filtered = df_filtered[df_filtered['channel'] == filters['channel']]
+    if filters.get('channel') and filters['channel'] != 'Todos' and 'channel' in df.columns:
+        keep(df['channel'] == filters['channel'])
     
     # Filtro de status
-    if filters.get('status') and filters['status'] != 'Todos' and 'status' in df_filtered.columns:
+    if filters.get('status') and filters['status'] != 'Todos' and 'status' in df.columns:
         # Mapear status amigáveis para valores reais
         status_map = {
             'Resolvido': 'RESOLVED',
@@ -238,58 +248,54 @@ def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
             'Requer Humano': 'HUMAN_REQUESTED'
         }
         status_value = status_map.get(filters['status'], filters['status'])
-        df_filtered = df_filtered[df_filtered['status'] == status_value]
+        keep(df['status'] == status_value)
     
     # Filtro de lead stage
-    if filters.get('lead_stage') and filters['lead_stage'] != 'Todos' and 'lead_stage' in df_filtered.columns:
-        df_filtered = df_filtered[df_filtered['lead_stage'] == filters['lead_stage'].lower()]
+    if filters.get('lead_stage') and filters['lead_stage'] != 'Todos' and 'lead_stage' in df.columns:
+        keep(df['lead_stage'] == filters['lead_stage'].lower())
     
     # Filtro de satisfação
-    if filters.get('satisfaction') and filters['satisfaction'] != 'Todos' and 'satisfaction_score' in df_filtered.columns:
+    if filters.get('satisfaction') and filters['satisfaction'] != 'Todos' and 'satisfaction_score' in df.columns:
         try:
-            df_filtered['satisfaction_score'] = pd.to_numeric(df_filtered['satisfaction_score'], errors='coerce')
-            
             if filters['satisfaction'] == 'Alta (4-5)':
-                df_filtered = df_filtered[df_filtered['satisfaction_score'] >= 4]
+                keep(df['satisfaction_score'] >= 4)
             elif filters['satisfaction'] == 'Média (3)':
-                df_filtered = df_filtered[df_filtered['satisfaction_score'] == 3]
+                keep(df['satisfaction_score'] == 3)
             elif filters['satisfaction'] == 'Baixa (1-2)':
-                df_filtered = df_filtered[df_filtered['satisfaction_score'] <= 2]
+                keep(df['satisfaction_score'] <= 2)
         except:
             st.warning("⚠️ Erro ao filtrar por satisfação")
     
     # Filtros avançados
     
     # Filtro de agente
-    if filters.get('agent') and filters['agent'] != 'Todos' and 'agent_id' in df_filtered.columns:
-        df_filtered = df_filtered[df_filtered['agent_id'] == filters['agent']]
+    if filters.get('agent') and filters['agent'] != 'Todos' and 'agent_id' in df.columns:
+        keep(df['agent_id'] == filters['agent'])
     
     # Filtro de tempo de resposta
-    if 'response_time_max' in filters and 'first_response_time' in df_filtered.columns:
+    if 'response_time_max' in filters and 'first_response_time' in df.columns:
         try:
-            df_filtered['first_response_time'] = pd.to_numeric(df_filtered['first_response_time'], errors='coerce')
             # Converter segundos para minutos
-            df_filtered = df_filtered[df_filtered['first_response_time'] <= filters['response_time_max'] * 60]
+            keep(df['first_response_time'] <= filters['response_time_max'] * 60)
         except:
             pass
     
     # Filtro de mensagens mínimas
-    if 'min_messages' in filters and filters['min_messages'] > 0 and 'message_count' in df_filtered.columns:
+    if 'min_messages' in filters and filters['min_messages'] > 0 and 'message_count' in df.columns:
         try:
-            df_filtered['message_count'] = pd.to_numeric(df_filtered['message_count'], errors='coerce')
-            df_filtered = df_filtered[df_filtered['message_count'] >= filters['min_messages']]
+            keep(df['message_count'] >= filters['min_messages'])
         except:
             pass
     
     # Filtro de frustração
-    if 'max_frustration' in filters and 'frustration_level' in df_filtered.columns:
+    if 'max_frustration' in filters and 'frustration_level' in df.columns:
         try:
-            df_filtered['frustration_level'] = pd.to_numeric(df_filtered['frustration_level'], errors='coerce')
-            df_filtered = df_filtered[df_filtered['frustration_level'] <= filters['max_frustration']]
+            keep(df['frustration_level'] <= filters['max_frustration'])
         except:
             pass
     
-    return df_filtered
+    # Sem filtro efetivo: cópia rasa (Copy-on-Write) em vez de copiar as linhas
+    return df.copy(deep=False) if mask.all() else df[mask]
 
 def get_filter_summary(filters: dict) -> str:
     """
@@ -117,14 +117,14 @@ def render_metrics_cards(df: pd.DataFrame):
     # Tempo médio de resposta (em minutos)
     tempo_resposta = 0
     if 'first_response_time' in df.columns:
-        tempo_resposta_segundos = pd.to_numeric(df['first_response_time'], errors='coerce').mean()
+        tempo_resposta_segundos = df['first_response_time'].mean()
         if pd.notna(tempo_resposta_segundos):
             tempo_resposta = tempo_resposta_segundos / 60  # Converter para minutos
     
     # Satisfação média
     satisfacao = 0
     if 'satisfaction_score' in df.columns:
-        satisfacao = pd.to_numeric(df['satisfaction_score'], errors='coerce').mean()
+        satisfacao = df['satisfaction_score'].mean()
         if pd.isna(satisfacao):
             satisfacao = 0
     
@@ -132,7 +132,7 @@ def render_metrics_cards(df: pd.DataFrame):
     taxa_resolucao = 0
     if 'resolved' in df.columns:
         try:
-            resolved_count = df['resolved'].astype(str).str.lower().isin(['true', '1', 'sim']).sum()
+            resolved_count = df['resolved'].sum()
             taxa_resolucao = (resolved_count / total_contatos * 100) if total_contatos > 0 else 0
         except:
             taxa_resolucao = 0
@@ -140,7 +140,7 @@ def render_metrics_cards(df: pd.DataFrame):
     # Tempo de resolução (em horas)
     tempo_resolucao = 0
     if 'resolution_time' in df.columns:
-        tempo_resolucao_minutos = pd.to_numeric(df['resolution_time'], errors='coerce').mean()
+        tempo_resolucao_minutos = df['resolution_time'].mean()
         if pd.notna(tempo_resolucao_minutos):
             tempo_resolucao = tempo_resolucao_minutos / 60  # Converter para horas
     
@@ -215,10 +215,9 @@ def render_metrics_cards(df: pd.DataFrame):
     mensagens_hoje = 0
     if 'created_at' in df.columns and 'message_count' in df.columns:
         try:
-            df['created_at'] = pd.to_datetime(df['created_at'])
             hoje = pd.Timestamp.now().date()
             mask_hoje = df['created_at'].dt.date == hoje
-            mensagens_hoje = pd.to_numeric(df.loc[mask_hoje, 'message_count'], errors='coerce').sum()
+            mensagens_hoje = df.loc[mask_hoje, 'message_count'].sum()
         except:
             mensagens_hoje = 0
     
@@ -0,0 +1,93 @@
+"""
+Classificadores de Conversas
+Lead quente e sentimento calculados com máscaras booleanas sobre colunas tipadas
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+from config.settings import LEAD_SCORING_CONFIG
+from src.data.scoring import numeric_values, flag_values
+
+def _filled(values, length: int, default: float) -> np.ndarray:
+    """Vetor numérico com vazios (ou coluna ausente) trocados pelo valor padrão"""
+    if values is None:
+        return np.full(length, default, dtype='float64')
+    return np.where(np.isnan(values), default, values)
+
+def _has_value(series: pd.Series) -> np.ndarray:
+    """Máscara dos valores preenchidos (nem vazio nem só espaços)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Avaliar só as categorias (poucas) e mapear pelos códigos
+        blank = series.cat.categories.astype(str).str.strip() == ''
+        codes = series.cat.codes.to_numpy()
+        return (codes >= 0) & ~np.append(blank, True)[codes]
+    return series.notna().to_numpy() & series.astype(str).str.strip().ne('').to_numpy()
+
+def detect_hot_leads(df: pd.DataFrame, criteria: Dict = None) -> pd.Series:
+    """
+    Marca os leads quentes (alta probabilidade de conversão)
+
+    Lead é quente com score muito alto, ou com score alto e ao menos um sinal
+    de interesse: muitas mensagens, satisfação alta ou menção a produto e preço.
+
+    Args:
+        df: DataFrame com lead_score já calculado
+        criteria: Limiares (padrão LEAD_SCORING_CONFIG['hot_lead'])
+
+    Returns:
+        Série booleana alinhada ao índice do DataFrame
+    """
+    criteria = criteria or LEAD_SCORING_CONFIG['hot_lead']
+    n_rows = len(df)
+
+    score = _filled(numeric_values(df, 'lead_score'), n_rows, 0)
+    messages = _filled(numeric_values(df, 'message_count'), n_rows, 0)
+    satisfaction = numeric_values(df, 'satisfaction_score')
+    satisfaction = np.zeros(n_rows) if satisfaction is None else satisfaction
+
+    with np.errstate(invalid='ignore'):
+        interest = (
+            (messages > criteria['min_messages'])
+            | (satisfaction >= criteria['min_satisfaction'])
+            | (flag_values(df, 'mentions_product') & flag_values(df, 'mentions_price'))
+        )
+        hot = ((score >= criteria['min_score']) & interest) | (score >= criteria['always_hot_score'])
+
+    return pd.Series(hot, index=df.index, name='is_hot_lead')
+
+def classify_sentiment(df: pd.DataFrame) -> pd.Series:
+    """
+    Sentimento de cada conversa a partir dos indicadores
+
+    Valores já informados em context_sentiment são mantidos; só as conversas
+    sem sentimento são classificadas: frustração alta ou escalada -> negative,
+    satisfação alta e resolvida -> positive, satisfação baixa -> negative,
+    senão neutral.
+
+    Args:
+        df: DataFrame com colunas padronizadas
+
+    Returns:
+        Série de texto alinhada ao índice do DataFrame
+    """
+    n_rows = len(df)
+    frustration = _filled(numeric_values(df, 'frustration_level'), n_rows, 0)
+    satisfaction = _filled(numeric_values(df, 'satisfaction_score'), n_rows, 3)
+
+    computed = np.select(
+        [
+            (frustration > 3) | flag_values(df, 'escalated_to_human'),
+            (satisfaction >= 4) & flag_values(df, 'resolved'),
+            satisfaction <= 2
+        ],
+        ['negative', 'positive', 'negative'],
+        default='neutral'
+    ).astype(object)
+
+    if 'context_sentiment' in df.columns:
+        current = df['context_sentiment']
+        computed = np.where(_has_value(current), current.to_numpy(dtype=object), computed)
+
+    return pd.Series(computed, index=df.index, name='context_sentiment', dtype=object)
@@ -5,43 +5,89 @@ Responsável por buscar dados das planilhas Google Sheets
 
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 from datetime import datetime
+import threading
 import logging
 
+from src.data.sources import create_data_source, DataSourceError
+from src.data.snapshots import Snapshot, get_snapshot_cache
+from src.data.storage import get_snapshot_store
+from src.data.refresher import get_refresher
+from src.data.singleflight import SingleFlight
+from src.utils.google_client import get_client_pool
+from src.utils.quota import quota_context, INTERACTIVE, BACKGROUND
+from config.settings import DATA_CONFIG
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Coletas em andamento por planilha (compartilhadas entre sessões e com o renovador)
+_flights = SingleFlight()
+
+# Sufixo da chave de cache dos dados com todas as colunas da planilha
+ALL_COLUMNS_SUFFIX = '#todas'
+
+def invalidate_snapshots(sheet_id: str):
+    """Descarta os snapshots do cliente (memória e disco) para forçar nova coleta"""
+    for key in (sheet_id, sheet_id + ALL_COLUMNS_SUFFIX):
+        get_snapshot_cache().invalidate(key)
+        get_snapshot_store().delete(key)
+
 class DataCollector:
     """Coletor principal de dados das planilhas"""
     
-    def __init__(self, sheet_id: str):
+    def __init__(self, sheet_id: str, source_type: str = 'sheets', source_path: str = '', worksheets: str = '',
+                 all_columns: bool = False):
         """
         Inicializa o coletor
         
         Args:
             sheet_id: 1b7CQ3TjbhLsYAKxyaWR7_GjmMSNv1ixmBHybEG2k_H0
+            source_type: Backend de dados ('sheets', 'csv', 'parquet' ou 'jsonl')
+            source_path: Caminho do arquivo local ou IDs de planilhas (vários separados por vírgula)
+            worksheets: Abas a ler em cada planilha (vírgula; aceita curingas, ex: 'Conversas *')
+            all_columns: Ler todas as colunas (padrão: só as usadas pelo dashboard)
         """
         self.sheet_id = sheet_id
+        self.source_type = (source_type or 'sheets').strip().lower()
+        self.source_location = source_path or sheet_id
+        self.worksheets = worksheets
+        self.all_columns = all_columns
+        self.columns = None if all_columns else DATA_CONFIG['dashboard_columns']
+        self.cache_key = sheet_id + ALL_COLUMNS_SUFFIX if all_columns else sheet_id
         self.client = None
         self.sheet = None
-        self._init_google_client()
+        self.snapshot = None  # Último snapshot entregue por load_data
+        
+        # Backends de arquivo não precisam de credenciais Google
+        if self.source_type == 'sheets':
+            self._init_google_client()
+    
+    @classmethod
+    def from_client_data(cls, client_data: dict, all_columns: bool = False) -> 'DataCollector':
+        """
+        Cria o coletor a partir dos dados do cliente autenticado
+        
+        Args:
+            client_data: Dict retornado por AuthManager.authenticate
+            all_columns: Ler todas as colunas (aba de dados detalhados / exportação CSV)
+        """
+        return cls(
+            client_data['planilha_id'],
+            source_type=client_data.get('fonte_dados', 'sheets'),
+            source_path=client_data.get('caminho_dados', ''),
+            worksheets=client_data.get('abas_dados', ''),
+            all_columns=all_columns
+        )
     
     def _init_google_client(self):
-        """Inicializa cliente Google Sheets"""
+        """Obtém cliente Google Sheets do pool compartilhado do processo"""
         try:
-            SCOPES = [
-                'https://www.googleapis.com/auth/spreadsheets',
-                'https://www.googleapis.com/auth/drive'
-            ]
+            pool = get_client_pool()
             
-            if 'GOOGLE_CREDENTIALS' in st.secrets:
-                creds_dict = dict(st.secrets['GOOGLE_CREDENTIALS'])
-                creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-                self.client = gspread.authorize(creds)
-                logger.info("Cliente Google Sheets inicializado com sucesso")
+            if pool:
+                self.client = pool.get_client()
             else:
                 logger.error("Credenciais Google não encontradas")
                 st.error("❌ Credenciais do Google não configuradas")
@@ -50,72 +96,50 @@ class DataCollector:
             logger.error(f"Erro ao inicializar cliente: {e}")
             st.error(f"❌ Erro na autenticação Google: {e}")
     
-    @st.cache_data(ttl=300)  # Cache por 5 minutos
-    def load_data(_self) -> pd.DataFrame:
+    def load_data(self) -> pd.DataFrame:
         """
-        Carrega dados da planilha do cliente
+        Carrega dados da fonte configurada para o cliente
+        
+        O resultado fica no cache de snapshots do processo, indexado por planilha_id,
+        e é reaproveitado por todas as sessões do mesmo cliente até o TTL expirar.
+        Depois do TTL a revisão da fonte é consultada e os dados só são baixados
+        de novo se a fonte mudou. Snapshots velhos são entregues na hora e
+        atualizados em segundo plano; só a primeira carga espera pela fonte, e
+        sessões simultâneas do mesmo cliente aguardam essa mesma coleta.
         
         Returns:
             DataFrame com os dados ou DataFrame vazio em caso de erro
         """
-        try:
-            if not _self.client:
-                return pd.DataFrame()
-            
-            # Abrir planilha
-            sheet = _self.client.open_by_key(_self.sheet_id)
-            
-            # Tentar múltiplas abas em ordem de preferência
-            worksheet_names = ['Contatos', 'Contacts', 'Conversas', 'Conversations', 'Sheet1']
-            worksheet = None
-            
-            for name in worksheet_names:
-                try:
-                    worksheet = sheet.worksheet(name)
-                    logger.info(f"Aba '{name}' encontrada")
-                    break
-                except:
-                    continue
-            
-            if not worksheet:
-                logger.warning("Nenhuma aba de dados encontrada")
-                st.warning("⚠️ Nenhuma aba de dados encontrada na planilha")
-                return pd.DataFrame()
-            
-            # Carregar todos os dados
-            all_values = worksheet.get_all_values()
-            
-            if not all_values or len(all_values) < 2:
-                logger.warning("Planilha sem dados suficientes")
+        cache = get_snapshot_cache()
+        snapshot = cache.get(self.cache_key)
+        
+        if snapshot is None:
+            try:
+                # Uma única carga por planilha; sessões simultâneas recebem o mesmo snapshot
+                snapshot = _flights.do(self.cache_key, self._load_missing)
+                
+            except DataSourceError as e:
+                logger.warning(str(e))
+                st.warning(f"⚠️ {e}")
                 return pd.DataFrame()
-            
-            # Processar dados
-            headers = all_values[0]
-            data_rows = all_values[1:]
-            
-            # Filtrar linhas completamente vazias
-            data_rows = [row for row in data_rows if any(cell.strip() for cell in row if cell)]
-            
-            if not data_rows:
-                logger.warning("Nenhuma linha de dados válida encontrada")
+            except Exception as e:
+                logger.error(f"Erro ao carregar dados: {e}")
+                st.error(f"❌ Erro ao carregar dados: {e}")
                 return pd.DataFrame()
-            
-            # Criar DataFrame
-            max_cols = len(headers)
-            processed_rows = []
-            
-            for row in data_rows:
-                # Garantir que todas as linhas tenham o mesmo número de colunas
-                while len(row) < max_cols:
-                    row.append('')
-                row = row[:max_cols]  # Cortar se tiver colunas extras
-                processed_rows.append(row)
-            
-            df = pd.DataFrame(processed_rows, columns=headers)
-            
-            # Log de sucesso
-            logger.info(f"Dados carregados com sucesso: {len(df)} registros, {len(df.columns)} colunas")
-            
+        
+        if not cache.is_fresh(snapshot):
+            # Stale-while-revalidate: servir o último snapshot válido sem esperar
+            # (inclui o snapshot lido do disco na partida a frio)
+            self._revalidate_in_background(snapshot)
+        
+        # Todas as colunas é opcional (sob demanda): não entra na renovação automática
+        if DATA_CONFIG['background_refresh'] and not self.all_columns:
+            get_refresher().register(self)
+        
+        self.snapshot = snapshot
+        df = snapshot.df
+        
+        if not df.empty:
             # Verificar colunas importantes para lead tracking
             required_cols = ['lead_stage', 'lead_qualified_date', 'lead_converted_date']
             missing_cols = [col for col in required_cols if col not in df.columns]
@@ -123,13 +147,99 @@ class DataCollector:
             if missing_cols:
                 st.info(f"ℹ️ Colunas de lead tracking ausentes: {', '.join(missing_cols)}")
                 st.info("💡 Adicione essas colunas na planilha para análise completa de funil")
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Erro ao carregar dados: {e}")
-            st.error(f"❌ Erro ao carregar dados: {e}")
-            return pd.DataFrame()
+        
+        return df
+    
+    def _load_missing(self) -> Snapshot:
+        """Carga sem snapshot em memória: disco (partida a frio) ou fonte"""
+        if DATA_CONFIG['persist_snapshots']:
+            snapshot = get_snapshot_store().load(self.cache_key)
+            if snapshot is not None:
+                get_snapshot_cache().put(self.cache_key, snapshot)
+                return snapshot
+        
+        # Alguém está esperando: fila interativa do agendador de cota
+        with quota_context(self.sheet_id, INTERACTIVE):
+            snapshot = self._fetch()
+        self._save_snapshot(snapshot)
+        return snapshot
+    
+    def _save_snapshot(self, snapshot: Snapshot, previous: Snapshot = None):
+        """Publica o snapshot no cache do processo e no disco"""
+        get_snapshot_cache().put(self.cache_key, snapshot)
+        
+        if DATA_CONFIG['persist_snapshots']:
+            if previous is not None and snapshot.df is previous.df:
+                # Fonte sem alterações: regravar só o manifesto
+                get_snapshot_store().touch(self.cache_key, snapshot)
+            else:
+                get_snapshot_store().save(self.cache_key, snapshot)
+    
+    def revalidate(self, snapshot: Snapshot = None) -> bool:
+        """
+        Busca dados atuais na thread corrente (usado pelo renovador em segundo plano)
+        
+        Args:
+            snapshot: Snapshot atual (permite leitura incremental / verificação de revisão)
+        
+        Returns:
+            False se já havia uma revalidação em andamento para a planilha
+        """
+        future = _flights.claim(self.cache_key)
+        if future is None:
+            return False
+        
+        self._revalidate(future, snapshot)
+        return True
+    
+    def _revalidate_in_background(self, snapshot: Snapshot):
+        """Dispara thread que busca dados atuais sem bloquear a renderização"""
+        future = _flights.claim(self.cache_key)
+        if future is None:
+            return
+        
+        thread = threading.Thread(
+            target=self._revalidate,
+            args=(future, snapshot),
+            name=f"revalidate-{self.cache_key}",
+            daemon=True
+        )
+        thread.start()
+    
+    def _revalidate(self, future, snapshot: Snapshot):
+        """Corpo da revalidação (sem chamadas de UI do Streamlit)"""
+        def refresh() -> Snapshot:
+            with quota_context(self.sheet_id, BACKGROUND):
+                fresh = self._fetch(previous=snapshot)
+            self._save_snapshot(fresh, snapshot)
+            return fresh
+        
+        # Sessões que chegarem sem snapshot durante a revalidação aguardam este resultado
+        _flights.complete(self.cache_key, future, refresh)
+        if future.exception() is not None:
+            logger.warning(f"Erro ao revalidar dados de {self.cache_key}: {future.exception()}")
+    
+    def _fetch(self, previous: Snapshot = None) -> Snapshot:
+        """
+        Busca os dados na fonte, sem passar pelo cache
+        
+        Args:
+            previous: Snapshot anterior (usado pela leitura incremental)
+        
+        Returns:
+            Snapshot com os dados brutos
+        """
+        source = create_data_source(
+            self.source_type, self.source_location, client=self.client,
+            worksheets=self.worksheets, columns=self.columns
+        )
+        snapshot = source.fetch(previous)
+        
+        df = snapshot.df
+        if not df.empty:
+            logger.info(f"Dados carregados de {source.describe()}: {len(df)} registros, {len(df.columns)} colunas")
+        
+        return snapshot
     
     def get_sheet_info(self) -> dict:
         """
@@ -0,0 +1,251 @@
+"""
+Índice de Filtros
+Posições das linhas por valor de cada filtro da barra lateral, montado uma vez por
+snapshot enriquecido; uma combinação de filtros vira interseção de posições e uma
+única seleção de linhas no final
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from src.data.scoring import OPERATORS, numeric_values
+
+logger = logging.getLogger(__name__)
+
+# Rótulo do filtro de status -> status padronizado
+STATUS_FILTER_MAP = {
+    'Resolvido': 'RESOLVED',
+    'Não Resolvido': 'UNRESOLVED',
+    'Requer Humano': 'HUMAN_REQUESTED'
+}
+
+# Faixa do filtro de satisfação -> (operador, limite) sobre satisfaction_score
+SATISFACTION_BUCKETS = {
+    'Alta (4-5)': ('>=', 4),
+    'Média (3)': ('==', 3),
+    'Baixa (1-2)': ('<=', 2)
+}
+
+# Colunas filtradas por igualdade (um valor escolhido na barra lateral)
+DIMENSIONS = ['channel', 'status', 'lead_stage', 'agent_id']
+
+# Colunas filtradas por limite numérico
+RANGE_COLUMNS = ['first_response_time', 'message_count', 'frustration_level']
+
+class FilterIndex:
+    """
+    Índice invertido das dimensões de filtro de um DataFrame enriquecido
+
+    Para cada dimensão guarda o código de cada linha e, para cada valor, as
+    posições (ordenadas) das linhas com aquele valor. Filtrar parte do conjunto
+    de posições menor e confere as demais condições só nessas linhas, então o
+    custo acompanha o tamanho do resultado e não o da tabela.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: DataFrame enriquecido (DataProcessor.enrich); não é alterado
+        """
+        self.n_rows = len(df)
+        self._codes: Dict[str, np.ndarray] = {}
+        self._lookup: Dict[str, Dict[Any, int]] = {}
+        self._rows: Dict[str, List[np.ndarray]] = {}
+
+        for column in DIMENSIONS:
+            if column in df.columns:
+                self._index_dimension(column, df[column])
+
+        self._numeric = {
+            column: numeric_values(df, column)
+            for column in RANGE_COLUMNS + ['satisfaction_score']
+            if column in df.columns
+        }
+
+        satisfaction = self._numeric.get('satisfaction_score')
+        self._satisfaction_rows = {}
+        if satisfaction is not None:
+            with np.errstate(invalid='ignore'):
+                for label, (op, limit) in SATISFACTION_BUCKETS.items():
+                    self._satisfaction_rows[label] = np.flatnonzero(OPERATORS[op](satisfaction, limit))
+
+        self._created_at = df['created_at'] if 'created_at' in df.columns else None
+        self._time_key = self._sorted_time_key(self._created_at)
+
+    def _index_dimension(self, column: str, series: pd.Series):
+        """Códigos por linha e posições por valor de uma dimensão"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+        # Ordenação estável: as posições de cada valor ficam em ordem crescente
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        self._codes[column] = codes
+        self._lookup[column] = {value: code for code, value in enumerate(uniques)}
+        self._rows[column] = [order[bounds[code]:bounds[code + 1]] for code in range(len(uniques))]
+
+    @staticmethod
+    def _sorted_time_key(series: Optional[pd.Series]) -> Optional[np.ndarray]:
+        """
+        Chave int64 crescente da data (época negada), se o DataFrame estiver
+        ordenado pela data mais recente com vazios no final; senão None
+        """
+        if series is None or not pd.api.types.is_datetime64_dtype(series.dtype):
+            return None
+
+        values = series.to_numpy()
+        key = -values.view('int64')
+        key[np.isnat(values)] = np.iinfo('int64').max
+        if len(key) > 1 and not (key[:-1] <= key[1:]).all():
+            return None
+        return key
+
+    @property
+    def time_sorted(self) -> bool:
+        """Linhas em ordem de data decrescente (o resultado dos filtros já sai ordenado)"""
+        return self._time_key is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memória aproximada do índice"""
+        arrays = list(self._codes.values()) + list(self._satisfaction_rows.values())
+        arrays += [rows for per_value in self._rows.values() for rows in per_value]
+        arrays += [values for values in self._numeric.values() if values is not None]
+        if self._time_key is not None:
+            arrays.append(self._time_key)
+        return int(sum(array.nbytes for array in arrays))
+
+    def _equals(self, column: str, value: Any):
+        """Posições e teste por linha de `coluna == valor`"""
+        code = self._lookup[column].get(value)
+        if code is None:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, lambda rows: np.zeros(len(rows), dtype=bool)
+
+        codes = self._codes[column]
+        return self._rows[column][code], lambda rows: codes[rows] == code
+
+    def _threshold(self, column: str, op: str, limit: float):
+        """Teste por linha de `coluna <op> limite` (vazios não passam)"""
+        values = self._numeric[column]
+
+        def test(rows):
+            with np.errstate(invalid='ignore'):
+                return OPERATORS[op](values[rows], limit)
+        return test
+
+    def _date_bounds(self, filters: Dict[str, Any]):
+        """Limites do período (dia final incluído)"""
+        start = pd.Timestamp(filters['date_start'])
+        end = pd.Timestamp(filters['date_end']) + timedelta(days=1)
+        return start, end
+
+    def _date_slice(self, start: pd.Timestamp, end: pd.Timestamp) -> slice:
+        """Faixa contínua de linhas do período, por busca binária na chave da data"""
+        unit = self._created_at.to_numpy().dtype
+        # Época negada: o fim exclusivo vira o limite inferior
+        low = -start.to_datetime64().astype(unit).view('int64')
+        high = -end.to_datetime64().astype(unit).view('int64')
+        return slice(
+            int(np.searchsorted(self._time_key, high, side='right')),
+            int(np.searchsorted(self._time_key, low, side='right'))
+        )
+
+    def _date_range(self, start: pd.Timestamp, end: pd.Timestamp):
+        """Teste por linha do período (DataFrame fora da ordem de data)"""
+        series = self._created_at
+
+        if pd.api.types.is_datetime64_dtype(series.dtype):
+            values = series.to_numpy()
+            start, end = start.to_datetime64(), end.to_datetime64()
+            return lambda rows: (values[rows] >= start) & (values[rows] < end)
+
+        mask = ((series >= start) & (series < end)).to_numpy(dtype=bool)
+        return lambda rows: mask[rows]
+
+    def select(self, filters: Dict[str, Any]) -> Union[np.ndarray, slice, None]:
+        """
+        Posições das linhas que atendem aos filtros (mesmas regras de _apply_filters)
+
+        Args:
+            filters: Filtros da barra lateral
+
+        Returns:
+            Posições em ordem crescente; a faixa contínua (slice) quando só o
+            período restringe as linhas; ou None se nenhum filtro restringe
+        """
+        indexed = []  # (posições, teste) das condições com posições pré-calculadas
+        tests = []    # Condições conferidas só nas linhas candidatas
+        window = None  # Faixa contínua do período (DataFrame ordenado pela data)
+
+        if 'date_start' in filters and 'date_end' in filters and self._created_at is not None:
+            try:
+                start, end = self._date_bounds(filters)
+                if self._time_key is not None:
+                    window = self._date_slice(start, end)
+                else:
+                    tests.append(self._date_range(start, end))
+            except Exception as e:
+                logger.warning(f"Erro ao filtrar por data: {e}")
+
+        if filters.get('channel') and filters['channel'] != 'Todos' and 'channel' in self._codes:
+            indexed.append(self._equals('channel', filters['channel'].lower()))
+
+        if filters.get('status') and filters['status'] != 'Todos' and 'status' in self._codes:
+            status_value = STATUS_FILTER_MAP.get(filters['status'], filters['status'])
+            indexed.append(self._equals('status', status_value))
+
+        if filters.get('lead_stage') and filters['lead_stage'] != 'Todos' and 'lead_stage' in self._codes:
+            indexed.append(self._equals('lead_stage', filters['lead_stage'].lower()))
+
+        satisfaction = filters.get('satisfaction')
+        if satisfaction in self._satisfaction_rows:
+            op, limit = SATISFACTION_BUCKETS[satisfaction]
+            indexed.append((self._satisfaction_rows[satisfaction], self._threshold('satisfaction_score', op, limit)))
+
+        if filters.get('agent') and filters['agent'] != 'Todos' and 'agent_id' in self._codes:
+            indexed.append(self._equals('agent_id', filters['agent']))
+
+        if 'response_time_max' in filters and 'first_response_time' in self._numeric:
+            tests.append(self._threshold('first_response_time', '<=', filters['response_time_max'] * 60))
+
+        if 'min_messages' in filters and filters['min_messages'] > 0 and 'message_count' in self._numeric:
+            tests.append(self._threshold('message_count', '>=', filters['min_messages']))
+
+        if 'max_frustration' in filters and 'frustration_level' in self._numeric:
+            tests.append(self._threshold('frustration_level', '<=', filters['max_frustration']))
+
+        if not indexed and not tests:
+            # Só o período: a faixa vira um recorte sem cópia das linhas
+            return window
+
+        if window is not None:
+            # Posições são crescentes: o recorte do período em cada uma também é busca binária
+            indexed = [
+                (positions[np.searchsorted(positions, window.start):np.searchsorted(positions, window.stop)], test)
+                for positions, test in indexed
+            ]
+
+        # Partir do menor conjunto de posições e conferir o resto só nele
+        indexed.sort(key=lambda condition: len(condition[0]))
+        if indexed:
+            rows = indexed[0][0]
+            tests = [test for _, test in indexed[1:]] + tests
+        elif window is not None:
+            # Posições só quando há outras condições para conferir na faixa
+            rows = np.arange(window.start, window.stop)
+        else:
+            rows = np.arange(self.n_rows)
+
+        for test in tests:
+            if not len(rows):
+                break
+            rows = rows[test(rows)]
+
+        return rows
@@ -0,0 +1,306 @@
+"""
+Ingestão de Dados Brutos
+Converte a matriz de valores da planilha em DataFrame usando operações em bloco (numpy)
+"""
+
+import numpy as np
+import pandas as pd
+import logging
+from itertools import chain
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+def rows_to_matrix(rows: List[List[str]], width: int) -> np.ndarray:
+    """
+    Monta matriz (linhas x width) de objetos, completando com '' ou cortando colunas extras
+
+    As células (e o preenchimento de cada linha curta) são encadeadas por
+    iteradores em C e copiadas de uma vez para um vetor, sem laço Python por
+    célula ou por linha.
+
+    Args:
+        rows: Linhas de valores (podem ter tamanhos diferentes)
+        width: Número de colunas do cabeçalho
+
+    Returns:
+        np.ndarray de dtype object com shape (len(rows), width)
+    """
+    n_rows = len(rows)
+    if n_rows == 0 or width == 0:
+        return np.full((n_rows, width), '', dtype=object)
+
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=n_rows)
+    longest = int(lengths.max())
+
+    # Caso comum (gspread já devolve linhas retangulares)
+    if longest == width and lengths.min() == width:
+        cells = chain.from_iterable(rows)
+        return np.fromiter(cells, dtype=object, count=n_rows * width).reshape(n_rows, width)
+
+    # Linhas curtas (batch_get corta as células vazias do final): cada linha é
+    # seguida da lista de '' que falta para completar a largura
+    if longest <= width:
+        pads = [[''] * missing for missing in range(width + 1)]
+        padded = zip(rows, map(pads.__getitem__, (width - lengths).tolist()))
+        cells = chain.from_iterable(chain.from_iterable(padded))
+        return np.fromiter(cells, dtype=object, count=n_rows * width).reshape(n_rows, width)
+
+    # Linhas mais longas que o cabeçalho: células distribuídas por índices calculados em bloco
+    total = int(lengths.sum())
+    flat = np.fromiter(chain.from_iterable(rows), dtype=object, count=total)
+    matrix = np.full((n_rows, width), '', dtype=object)
+
+    row_ids = np.repeat(np.arange(n_rows), lengths)
+    starts = np.cumsum(lengths) - lengths
+    col_ids = np.arange(total) - np.repeat(starts, lengths)
+
+    inside = col_ids < width
+    matrix[row_ids[inside], col_ids[inside]] = flat[inside]
+    return matrix
+
+def blocks_to_matrix(blocks: List[List[List[str]]], widths: List[int]) -> np.ndarray:
+    """
+    Junta lado a lado blocos de colunas lidos separadamente (um intervalo por bloco)
+
+    Cada bloco pode ter um número diferente de linhas (a API corta as linhas
+    vazias do final); os mais curtos são completados com ''.
+
+    Args:
+        blocks: Linhas de cada bloco
+        widths: Número de colunas de cada bloco
+
+    Returns:
+        np.ndarray de dtype object com shape (maior bloco, soma das larguras)
+    """
+    n_rows = max((len(block) for block in blocks), default=0)
+    matrices = [
+        rows_to_matrix(list(block) + [[]] * (n_rows - len(block)), width)
+        for block, width in zip(blocks, widths)
+    ]
+    if len(matrices) == 1:
+        return matrices[0]
+    return np.hstack(matrices) if matrices else np.empty((0, 0), dtype=object)
+
+def non_blank_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Máscara das linhas com ao menos uma célula não vazia (espaços não contam)
+
+    A matriz é percorrida por coluna: a primeira decide quase todas as linhas e
+    as seguintes só são conferidas nas linhas ainda sem valor.
+
+    Args:
+        matrix: Matriz de strings (dtype object, sem None)
+
+    Returns:
+        np.ndarray booleano com uma posição por linha
+    """
+    keep = np.zeros(matrix.shape[0], dtype=bool)
+    pending = np.arange(matrix.shape[0])
+
+    for column in range(matrix.shape[1]):
+        cells = matrix[pending, column].tolist()
+        filled = np.fromiter(map(bool, map(str.strip, cells)), dtype=bool, count=len(cells))
+        keep[pending[filled]] = True
+        pending = pending[~filled]
+        if not len(pending):
+            break
+
+    return keep
+
+def values_to_dataframe(all_values: List[List[str]]) -> pd.DataFrame:
+    """
+    Converte a matriz de valores (primeira linha = cabeçalho) em DataFrame
+
+    Args:
+        all_values: Lista de linhas retornada pela planilha
+
+    Returns:
+        DataFrame com linhas vazias removidas e largura igual ao cabeçalho
+    """
+    if not all_values or len(all_values) < 2:
+        logger.warning("Planilha sem dados suficientes")
+        return pd.DataFrame()
+
+    headers = all_values[0]
+    return matrix_to_dataframe(headers, rows_to_matrix(all_values[1:], len(headers)))
+
+def matrix_to_dataframe(headers: List[str], matrix: np.ndarray) -> pd.DataFrame:
+    """
+    Converte a matriz de dados (sem cabeçalho) em DataFrame
+
+    Args:
+        headers: Nomes das colunas
+        matrix: Matriz de strings com uma coluna por cabeçalho
+
+    Returns:
+        DataFrame com linhas vazias removidas
+    """
+    df = frame_from_matrix(headers, matrix)
+    if df.empty:
+        logger.warning("Nenhuma linha de dados válida encontrada")
+    return df
+
+def frame_from_matrix(headers: List[str], matrix: np.ndarray) -> pd.DataFrame:
+    """Mesmo que matrix_to_dataframe, sem aviso quando não sobram linhas (usado por bloco)"""
+    # Filtrar linhas completamente vazias
+    keep = non_blank_rows(matrix)
+    if not keep.any():
+        return pd.DataFrame()
+
+    if not keep.all():
+        matrix = matrix[keep]
+
+    # dtype object evita a inferência célula a célula de tipo texto do pandas;
+    # a matriz já é uma cópia própria, então pode ser usada sem copiar de novo
+    return pd.DataFrame(matrix, columns=headers, dtype=object, copy=False)
+
+class ColumnarBuffer:
+    """
+    Buffer colunar pré-alocado que recebe DataFrames já tipados, bloco a bloco
+
+    Cada coluna é um vetor numpy do tipo final (datetime, float, bool, inteiro
+    com máscara, códigos de categoria ou objeto). Os blocos são copiados para
+    os vetores e podem ser descartados em seguida, então o pico de memória fica
+    em uma cópia dos dados mais um bloco.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Número de linhas reservado (cresce se necessário)
+        """
+        self.capacity = max(1, capacity)
+        self.size = 0
+        self.columns = None
+        self._stores: List[Dict] = []
+
+    def append(self, chunk: pd.DataFrame):
+        """Copia um bloco tipado para o final do buffer"""
+        if chunk.empty:
+            return
+
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self._stores = [self._new_store(chunk.iloc[:, i].dtype) for i in range(len(self.columns))]
+
+        n_rows = len(chunk)
+        self._reserve(self.size + n_rows)
+
+        for i, store in enumerate(self._stores):
+            series = chunk.iloc[:, i]
+            if self._kind(series.dtype) != store['kind'] or (
+                store['kind'] == 'numpy' and series.dtype != store['values'].dtype
+            ):
+                # Tipo diferente do primeiro bloco: a coluna passa a ser objeto
+                store = self._stores[i] = self._to_object(store)
+            self._write(store, self.size, series)
+
+        self.size += n_rows
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame com as linhas recebidas
+
+        Usa os vetores do buffer sem copiar. Se sobrou muita capacidade (mais de
+        um quarto, ex: linhas vazias descartadas), os vetores antes são reduzidos
+        ao número de linhas, para o DataFrame não segurar a reserva inteira.
+        """
+        if self.columns is None or self.size == 0:
+            return pd.DataFrame()
+
+        if self.size < self.capacity * 3 // 4:
+            self._shrink()
+
+        data = {i: self._column(store) for i, store in enumerate(self._stores)}
+        df = pd.DataFrame(data, copy=False)
+        df.columns = self.columns
+        return df
+
+    @staticmethod
+    def _kind(dtype) -> str:
+        if isinstance(dtype, pd.CategoricalDtype):
+            return 'category'
+        if isinstance(dtype, pd.Int64Dtype):
+            return 'masked'
+        if isinstance(dtype, np.dtype) and dtype.kind in 'bfiuM':
+            return 'numpy'
+        return 'object'
+
+    def _new_store(self, dtype) -> Dict:
+        kind = self._kind(dtype)
+        if kind == 'category':
+            return {'kind': kind, 'values': np.full(self.capacity, -1, dtype=np.int32), 'categories': {}}
+        if kind == 'masked':
+            return {'kind': kind, 'values': np.zeros(self.capacity, dtype=np.int64),
+                    'mask': np.ones(self.capacity, dtype=bool)}
+        if kind == 'numpy':
+            return {'kind': kind, 'values': np.empty(self.capacity, dtype=dtype)}
+        return {'kind': kind, 'values': np.empty(self.capacity, dtype=object)}
+
+    def _reserve(self, n_rows: int):
+        """Aumenta a capacidade (dobrando) quando o próximo bloco não cabe"""
+        if n_rows <= self.capacity:
+            return
+
+        capacity = max(n_rows, self.capacity * 2)
+        for store in self._stores:
+            for name in ('values', 'mask'):
+                if name in store:
+                    grown = np.empty(capacity, dtype=store[name].dtype)
+                    grown[:self.size] = store[name][:self.size]
+                    store[name] = grown
+        self.capacity = capacity
+
+    def _shrink(self):
+        """Copia cada vetor para o tamanho exato (uma coluna por vez) e libera a reserva"""
+        for store in self._stores:
+            for name in ('values', 'mask'):
+                if name in store:
+                    store[name] = store[name][:self.size].copy()
+        self.capacity = self.size
+
+    def _write(self, store: Dict, start: int, series: pd.Series):
+        end = start + len(series)
+        kind = store['kind']
+
+        if kind == 'numpy':
+            store['values'][start:end] = series.to_numpy(dtype=store['values'].dtype)
+        elif kind == 'masked':
+            store['values'][start:end] = series.to_numpy(dtype=np.int64, na_value=0)
+            store['mask'][start:end] = series.isna().to_numpy()
+        elif kind == 'category':
+            # Categorias do bloco recebem códigos globais (união entre blocos);
+            # a última posição do mapa leva o código -1 (vazio) a ele mesmo
+            categories = store['categories']
+            lookup = np.fromiter(
+                chain((categories.setdefault(value, len(categories)) for value in series.cat.categories), [-1]),
+                dtype=np.int32, count=len(series.cat.categories) + 1
+            )
+            store['values'][start:end] = lookup[series.cat.codes.to_numpy()]
+        else:
+            store['values'][start:end] = series.to_numpy(dtype=object)
+
+    def _column(self, store: Dict):
+        size = self.size
+        kind = store['kind']
+
+        if kind == 'masked':
+            return pd.arrays.IntegerArray(store['values'][:size], store['mask'][:size])
+        if kind == 'category':
+            values = pd.Categorical.from_codes(store['values'][:size], categories=list(store['categories']))
+            try:
+                # Mesma ordem de categorias de astype('category') sobre a coluna inteira
+                return values.reorder_categories(sorted(store['categories']))
+            except TypeError:
+                return values
+        if kind == 'object':
+            # Mantém dtype object (como o caminho sem blocos), sem inferir texto
+            return pd.Series(store['values'][:size], dtype=object, copy=False)
+        return store['values'][:size]
+
+    def _to_object(self, store: Dict) -> Dict:
+        values = np.empty(self.capacity, dtype=object)
+        if self.size:
+            values[:self.size] = pd.Series(self._column(store)).to_numpy(dtype=object)
+        return {'kind': 'object', 'values': values}
@@ -7,59 +7,187 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, Any, Optional
+import weakref
+from typing import Dict, Any, Optional, Tuple
+
+from src.data.schema import ensure_datetime
+from src.data.snapshots import Snapshot, get_enriched_cache
+from src.data.scoring import compute_lead_score, compute_lead_stage, scoring_rules_key
+from src.data.classifiers import detect_hot_leads, classify_sentiment
+from src.data.filter_index import FilterIndex, STATUS_FILTER_MAP
 
 logger = logging.getLogger(__name__)
 
+# Copy-on-Write: seleções e cópias rasas compartilham os dados até alguma ser
+# alterada, então nenhuma etapa precisa de cópia defensiva (padrão no pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def map_labels(series: pd.Series, mapping: Dict[str, str], default: Optional[str] = None,
+               missing: Optional[str] = None) -> pd.Series:
+    """
+    Padroniza rótulos pela tabela de códigos (só os valores distintos são processados)
+
+    Os valores são fatorados, cada rótulo distinto é convertido para minúsculas
+    e mapeado uma vez, e o resultado volta para as linhas pelos códigos. O custo
+    acompanha o número de rótulos distintos, não o de linhas.
+
+    Args:
+        series: Coluna de rótulos (texto ou categórica)
+        mapping: Rótulo em minúsculas -> rótulo padronizado
+        default: Rótulo para valores fora do mapa (None = mantém o valor em minúsculas)
+        missing: Rótulo para vazios (None = continua vazio)
+
+    Returns:
+        Série categórica alinhada ao índice da coluna
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+    keys = pd.Index(uniques).astype(str).str.lower()
+    labels = [mapping.get(key, key if default is None else default) for key in keys]
+    if missing is not None:
+        labels.append(missing)  # Posição -1 dos códigos (vazios)
+
+    # Rótulos repetidos (ex: 'wa' e 'whatsapp') viram uma única categoria
+    label_codes, categories = pd.factorize(pd.Index(labels, dtype=object))
+    if missing is None:
+        label_codes = np.append(label_codes, -1)
+
+    values = pd.Categorical.from_codes(label_codes[codes], categories=categories)
+    return pd.Series(values, index=series.index, name=series.name)
+
 class DataProcessor:
     """Processador de dados do dashboard"""
     
-    def __init__(self):
-        """Inicializa o processador"""
+    def __init__(self, scoring_rules=None):
+        """
+        Inicializa o processador
+        
+        Args:
+            scoring_rules: Regras do lead score do cliente (JSON, lista ou dict;
+                None = LEAD_SCORING_CONFIG)
+        """
         self.processed_data = None
+        self.scoring_rules = scoring_rules
     
-    def process_data(self, df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
+    def process_data(self, df: pd.DataFrame, filters: Dict[str, Any], cache_key: str = None) -> pd.DataFrame:
         """
         Processa e filtra dados conforme necessário
-        
+
         Args:
             df: DataFrame bruto
             filters: Filtros aplicados
-            
+            cache_key: Chave dos dados do cliente (DataCollector.cache_key); quando
+                informada, o enriquecimento é reaproveitado enquanto os dados não mudam
+
         Returns:
             DataFrame processado
         """
         if df is None or df.empty:
             logger.warning("DataFrame vazio recebido para processamento")
             return pd.DataFrame()
-        
+
         try:
-            # Fazer cópia para não modificar original
-            processed_df = df.copy()
-            
-            # Aplicar processamentos básicos
-            processed_df = self._standardize_columns(processed_df)
-            processed_df = self._calculate_metrics(processed_df)
-            processed_df = self._apply_lead_scoring(processed_df)
-            processed_df = self._detect_hot_leads(processed_df)
-            processed_df = self._analyze_sentiment(processed_df)
-            
-            # Aplicar filtros
-            processed_df = self._apply_filters(processed_df, filters)
-            
-            # Ordenar por data mais recente
-            if 'created_at' in processed_df.columns:
-                processed_df = processed_df.sort_values('created_at', ascending=False)
-            
+            enriched_df, filter_index = self._enrich_indexed(df, cache_key)
+            processed_df = self.filter_and_sort(enriched_df, filters, filter_index)
+
             self.processed_data = processed_df
             logger.info(f"✅ Processamento concluído: {len(processed_df)} registros")
-            
+
             return processed_df
-            
+
         except Exception as e:
             logger.error(f"❌ Erro no processamento: {e}")
             return df
-    
+
+    def enrich(self, df: pd.DataFrame, cache_key: str = None) -> pd.DataFrame:
+        """
+        Padroniza e enriquece os dados (métricas, score, etapa, lead quente, sentimento)
+
+        O resultado não depende dos filtros. Com cache_key, fica guardado por
+        cliente e regras de score e vale enquanto o DataFrame bruto for o mesmo
+        objeto (o snapshot só troca o DataFrame quando a fonte muda). O DataFrame
+        guardado fica em ordem de data decrescente.
+
+        Args:
+            df: DataFrame bruto
+            cache_key: Chave dos dados do cliente (None = sem cache)
+
+        Returns:
+            DataFrame enriquecido (compartilhado entre sessões; não alterar)
+        """
+        return self._enrich_indexed(df, cache_key)[0]
+
+    def _enrich_indexed(self, df: pd.DataFrame, cache_key: str = None) -> Tuple[pd.DataFrame, Optional[FilterIndex]]:
+        """DataFrame enriquecido e, quando guardado em cache, o índice dos filtros"""
+        if cache_key:
+            key = f"{cache_key}|{scoring_rules_key(self.scoring_rules)}"
+            cache = get_enriched_cache()
+            entry = cache.get(key)
+            if entry is not None and entry.meta['source']() is df:
+                return entry.df, entry.meta['filter_index']
+
+        # Cópia rasa: as colunas novas não aparecem no original e, com Copy-on-Write,
+        # os dados só são copiados se alguma coluna existente for alterada
+        enriched_df = df.copy(deep=False)
+
+        # Aplicar processamentos básicos
+        enriched_df = self._standardize_columns(enriched_df)
+        enriched_df = self._calculate_metrics(enriched_df)
+        enriched_df = self._apply_lead_scoring(enriched_df)
+        enriched_df = self._detect_hot_leads(enriched_df)
+        enriched_df = self._analyze_sentiment(enriched_df)
+
+        if not cache_key:
+            return enriched_df, None
+
+        # Ordenar uma vez pela data mais recente: o período vira uma faixa contínua
+        # de linhas e o resultado dos filtros já sai na ordem de exibição
+        if 'created_at' in enriched_df.columns:
+            enriched_df = enriched_df.sort_values('created_at', ascending=False, kind='stable')
+
+        # O índice só compensa quando o mesmo DataFrame é filtrado várias vezes
+        filter_index = FilterIndex(enriched_df)
+
+        # Referência fraca: o cache não segura o DataFrame bruto já substituído.
+        # Medida rasa: o texto das colunas originais já conta no cache de snapshots
+        nbytes = int(enriched_df.memory_usage(index=True, deep=False).sum()) + filter_index.nbytes
+        entry = Snapshot(enriched_df, meta={'source': weakref.ref(df), 'filter_index': filter_index}, nbytes=nbytes)
+        cache.put(key, entry)
+        logger.info(f"Dados enriquecidos guardados em cache: {cache_key} ({len(enriched_df)} registros)")
+
+        return enriched_df, filter_index
+
+    def filter_and_sort(self, df: pd.DataFrame, filters: Dict[str, Any],
+                        filter_index: Optional[FilterIndex] = None) -> pd.DataFrame:
+        """
+        Aplica os filtros e ordena pela data mais recente
+
+        Args:
+            df: DataFrame enriquecido (não é alterado)
+            filters: Filtros aplicados
+            filter_index: Índice dos filtros montado sobre df (None = filtrar por máscaras)
+
+        Returns:
+            Novo DataFrame filtrado e ordenado
+        """
+        if filter_index is None:
+            filtered_df = self._apply_filters(df, filters)
+        else:
+            # Posições ou, só com o período, uma faixa contínua (recorte sem cópia)
+            rows = filter_index.select(filters)
+            filtered_df = df.copy(deep=False) if rows is None else df.iloc[rows]
+            logger.info(f"✅ Filtros aplicados: {len(filtered_df)} registros restantes")
+
+        # Ordenar por data mais recente (o índice já vem na ordem da data)
+        if 'created_at' in filtered_df.columns and not (filter_index and filter_index.time_sorted):
+            filtered_df = filtered_df.sort_values('created_at', ascending=False, kind='stable')
+
+        return filtered_df
+
     def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Padroniza nomes e tipos de colunas"""
         
@@ -111,8 +239,7 @@ class DataProcessor:
         }
         
         if 'status' in df.columns:
-            df['status'] = df['status'].astype(str).str.lower()
-            df['status'] = df['status'].map(lambda x: status_mapping.get(x, 'UNRESOLVED'))
+            df['status'] = map_labels(df['status'], status_mapping, default='UNRESOLVED', missing='UNRESOLVED')
         
         # Padronizar canais
         channel_mapping = {
@@ -129,8 +256,7 @@ class DataProcessor:
         }
         
         if 'channel' in df.columns:
-            df['channel'] = df['channel'].astype(str).str.lower()
-            df['channel'] = df['channel'].map(lambda x: channel_mapping.get(x, x))
+            df['channel'] = map_labels(df['channel'], channel_mapping)
         
         return df
     
@@ -147,9 +273,7 @@ class DataProcessor:
         
         # Calcular SLA status
         if 'first_response_time' in df.columns:
-            df['sla_status'] = df['first_response_time'].apply(
-                lambda x: 'within_sla' if pd.notna(x) and x <= 300 else 'exceeded_sla'
-            )
+            df['sla_status'] = np.where(df['first_response_time'] <= 300, 'within_sla', 'exceeded_sla')
         
         # Calcular satisfação categorizada
         if 'satisfaction_score' in df.columns:
@@ -162,222 +286,98 @@ class DataProcessor:
         
         # Adicionar informações temporais
         if 'created_at' in df.columns:
-            df['created_date'] = pd.to_datetime(df['created_at']).dt.date
-            df['created_hour'] = pd.to_datetime(df['created_at']).dt.hour
-            df['created_weekday'] = pd.to_datetime(df['created_at']).dt.day_name()
-            df['created_week'] = pd.to_datetime(df['created_at']).dt.isocalendar().week
-            df['created_month'] = pd.to_datetime(df['created_at']).dt.month_name()
+            # Já vem tipada da ingestão (ensure_datetime não reconverte)
+            created_at = ensure_datetime(df['created_at'])
+            df['created_date'] = created_at.dt.date
+            df['created_hour'] = created_at.dt.hour
+            df['created_weekday'] = created_at.dt.day_name()
+            df['created_week'] = created_at.dt.isocalendar().week
+            df['created_month'] = created_at.dt.month_name()
         
         return df
     
     def _apply_lead_scoring(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calcula score de leads baseado em comportamento"""
         
-        def calculate_lead_score(row):
-            score = 0
-            
-            # Pontuação por engajamento
-            if pd.notna(row.get('message_count', 0)):
-                if row['message_count'] > 10:
-                    score += 20
-                elif row['message_count'] > 5:
-                    score += 10
-            
-            # Pontuação por satisfação
-            if pd.notna(row.get('satisfaction_score', 0)):
-                if row['satisfaction_score'] >= 4:
-                    score += 25
-                elif row['satisfaction_score'] >= 3:
-                    score += 10
-            
-            # Pontuação por resolução
-            if row.get('resolved', False):
-                score += 15
-            
-            # Pontuação por tempo de resposta rápido
-            if pd.notna(row.get('first_response_time', 0)):
-                if row['first_response_time'] <= 60:  # 1 minuto
-                    score += 20
-                elif row['first_response_time'] <= 300:  # 5 minutos
-                    score += 10
-            
-            # Pontuação por canal
-            preferred_channels = ['whatsapp', 'telefone']
-            if row.get('channel', '') in preferred_channels:
-                score += 10
-            
-            # Penalização por frustração
-            if pd.notna(row.get('frustration_level', 0)):
-                try:
-                    frustration = float(row['frustration_level'])
-                    if frustration > 3:
-                        score -= 15
-                except:
-                    pass
-            
-            # Bonus por menções a produtos/preços
-            if row.get('mentions_product', False):
-                score += 15
-            if row.get('mentions_price', False):
-                score += 10
-            if row.get('mentions_quantity', False):
-                score += 5
-            
-            return min(100, max(0, score))  # Limitar entre 0 e 100
-        
         if 'lead_score' in df.columns:
-            df['lead_score'] = df.apply(calculate_lead_score, axis=1)
-        
-        # Atualizar lead_stage baseado no score e outros fatores
-        def determine_lead_stage(row):
-            current_stage = row.get('lead_stage', 'novo')
-            
-            # Se já está convertido ou perdido, manter
-            if current_stage in ['convertido', 'perdido']:
-                return current_stage
-            
-            score = row.get('lead_score', 0)
-            resolved = row.get('resolved', False)
-            
-            if score >= 70 and resolved:
-                return 'convertido'
-            elif score >= 50:
-                return 'qualificado'
-            elif score < 20 and row.get('frustration_level', 0) > 4:
-                return 'perdido'
-            else:
-                return 'novo'
-        
-        df['lead_stage'] = df.apply(determine_lead_stage, axis=1)
+            df['lead_score'] = compute_lead_score(df, self.scoring_rules)
+        
+        # Atualizar lead_stage baseado no score e outros fatores (com a regra aplicada)
+        df['lead_stage'], df['lead_stage_rule'] = compute_lead_stage(df)
         
         return df
     
     def _detect_hot_leads(self, df: pd.DataFrame) -> pd.DataFrame:
         """Identifica leads quentes com alta probabilidade de conversão"""
-        
-        def is_hot_lead(row):
-            # Critérios para hot lead
-            score = row.get('lead_score', 0)
-            messages = row.get('message_count', 0)
-            satisfaction = row.get('satisfaction_score', 0)
-            mentions_product = row.get('mentions_product', False)
-            mentions_price = row.get('mentions_price', False)
-            
-            # Lead é quente se:
-            # - Score alto (>= 60) E
-            # - (Muitas mensagens OU Alta satisfação OU Menciona produto/preço)
-            if score >= 60:
-                if messages > 8 or satisfaction >= 4 or (mentions_product and mentions_price):
-                    return True
-            
-            # Ou se tem score muito alto
-            if score >= 80:
-                return True
-            
-            return False
-        
-        df['is_hot_lead'] = df.apply(is_hot_lead, axis=1)
-        
+        df['is_hot_lead'] = detect_hot_leads(df)
         return df
     
     def _analyze_sentiment(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Análise de sentimento baseada em indicadores"""
-        
-        def analyze_sentiment(row):
-            # Análise simples baseada em indicadores disponíveis
-            frustration = row.get('frustration_level', 0)
-            satisfaction = row.get('satisfaction_score', 3)
-            resolved = row.get('resolved', False)
-            escalated = row.get('escalated_to_human', False)
-            
-            # Se já tem context_sentiment, usar
-            if pd.notna(row.get('context_sentiment')):
-                return row['context_sentiment']
-            
-            # Calcular sentimento baseado em métricas
-            try:
-                frustration = float(frustration) if pd.notna(frustration) else 0
-                satisfaction = float(satisfaction) if pd.notna(satisfaction) else 3
-                
-                if frustration > 3 or escalated:
-                    return 'negative'
-                elif satisfaction >= 4 and resolved:
-                    return 'positive'
-                elif satisfaction <= 2:
-                    return 'negative'
-                else:
-                    return 'neutral'
-            except:
-                return 'neutral'
-        
-        if 'context_sentiment' not in df.columns:
-            df['context_sentiment'] = df.apply(analyze_sentiment, axis=1)
-        
+        """Análise de sentimento baseada em indicadores (mantém o sentimento informado)"""
+        df['context_sentiment'] = classify_sentiment(df)
         return df
     
     def _apply_filters(self, df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
-        """Aplica filtros ao DataFrame"""
+        """Aplica filtros ao DataFrame (máscaras combinadas e uma única seleção de linhas)"""
         
         if df.empty:
             return df
         
-        filtered_df = df.copy()
+        mask = np.ones(len(df), dtype=bool)
+        
+        def keep(condition: pd.Series):
+            """Restringe a máscara (vazios não passam)"""
+            np.logical_and(mask, condition.to_numpy(dtype=bool, na_value=False), out=mask)
         
         # Filtro de data
-        if 'date_start' in filters and 'date_end' in filters and 'created_at' in filtered_df.columns:
+        if 'date_start' in filters and 'date_end' in filters and 'created_at' in df.columns:
             try:
-                # Garantir que created_at é datetime
-                filtered_df['created_at'] = pd.to_datetime(filtered_df['created_at'])
-                
                 # Converter dates para datetime para comparação
                 start_date = pd.Timestamp(filters['date_start'])
                 end_date = pd.Timestamp(filters['date_end']) + timedelta(days=1)  # Incluir o dia final completo
                 
-                mask = (filtered_df['created_at'] >= start_date) & (filtered_df['created_at'] < end_date)
-                filtered_df = filtered_df[mask]
+                keep((df['created_at'] >= start_date) & (df['created_at'] < end_date))
             except Exception as e:
                 logger.warning(f"Erro ao filtrar por data: {e}")
         
         # Filtro de canal
-        if filters.get('channel') and filters['channel'] != 'Todos' and 'channel' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['channel'] == filters['channel'].lower()]
+        if filters.get('channel') and filters['channel'] != 'Todos' and 'channel' in df.columns:
+            keep(df['channel'] == filters['channel'].lower())
         
         # Filtro de status
-        if filters.get('status') and filters['status'] != 'Todos' and 'status' in filtered_df.columns:
-            status_filter_map = {
-                'Resolvido': 'RESOLVED',
-                'Não Resolvido': 'UNRESOLVED',
-                'Requer Humano': 'HUMAN_REQUESTED'
-            }
-            status_value = status_filter_map.get(filters['status'], filters['status'])
-            filtered_df = filtered_df[filtered_df['status'] == status_value]
+        if filters.get('status') and filters['status'] != 'Todos' and 'status' in df.columns:
+            status_value = STATUS_FILTER_MAP.get(filters['status'], filters['status'])
+            keep(df['status'] == status_value)
         
         # Filtro de lead stage
-        if filters.get('lead_stage') and filters['lead_stage'] != 'Todos' and 'lead_stage' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['lead_stage'] == filters['lead_stage'].lower()]
+        if filters.get('lead_stage') and filters['lead_stage'] != 'Todos' and 'lead_stage' in df.columns:
+            keep(df['lead_stage'] == filters['lead_stage'].lower())
         
         # Filtro de satisfação
-        if filters.get('satisfaction') and filters['satisfaction'] != 'Todos' and 'satisfaction_score' in filtered_df.columns:
+        if filters.get('satisfaction') and filters['satisfaction'] != 'Todos' and 'satisfaction_score' in df.columns:
             if filters['satisfaction'] == 'Alta (4-5)':
-                filtered_df = filtered_df[filtered_df['satisfaction_score'] >= 4]
+                keep(df['satisfaction_score'] >= 4)
             elif filters['satisfaction'] == 'Média (3)':
-                filtered_df = filtered_df[filtered_df['satisfaction_score'] == 3]
+                keep(df['satisfaction_score'] == 3)
             elif filters['satisfaction'] == 'Baixa (1-2)':
-                filtered_df = filtered_df[filtered_df['satisfaction_score'] <= 2]
+                keep(df['satisfaction_score'] <= 2)
         
         # Filtros avançados
-        if filters.get('agent') and filters['agent'] != 'Todos' and 'agent_id' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['agent_id'] == filters['agent']]
+        if filters.get('agent') and filters['agent'] != 'Todos' and 'agent_id' in df.columns:
+            keep(df['agent_id'] == filters['agent'])
         
-        if 'response_time_max' in filters and 'first_response_time' in filtered_df.columns:
+        if 'response_time_max' in filters and 'first_response_time' in df.columns:
             max_seconds = filters['response_time_max'] * 60
-            filtered_df = filtered_df[filtered_df['first_response_time'] <= max_seconds]
+            keep(df['first_response_time'] <= max_seconds)
+        
+        if 'min_messages' in filters and filters['min_messages'] > 0 and 'message_count' in df.columns:
+            keep(df['message_count'] >= filters['min_messages'])
         
-        if 'min_messages' in filters and filters['min_messages'] > 0 and 'message_count' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['message_count'] >= filters['min_messages']]
+        if 'max_frustration' in filters and 'frustration_level' in df.columns:
+            keep(df['frustration_level'] <= filters['max_frustration'])
         
-        if 'max_frustration' in filters and 'frustration_level' in filtered_df.columns:
-            filtered_df = filtered_df[pd.to_numeric(filtered_df['frustration_level'], errors='coerce') <= filters['max_frustration']]
+        # Sem filtro efetivo: cópia rasa em vez de copiar as linhas
+        filtered_df = df.copy(deep=False) if mask.all() else df[mask]
         
         logger.info(f"✅ Filtros aplicados: {len(filtered_df)} registros restantes")
         
@@ -392,8 +392,9 @@ class DataProcessor:
         stats = {
             'total_conversations': len(df),
             'unique_contacts': df['contact_name'].nunique() if 'contact_name' in df.columns else 0,
-            'channels': df['channel'].value_counts().to_dict() if 'channel' in df.columns else {},
-            'lead_stages': df['lead_stage'].value_counts().to_dict() if 'lead_stage' in df.columns else {},
+            # Coluna categórica: value_counts inclui categorias sem linhas no filtro
+            'channels': df['channel'].value_counts().loc[lambda counts: counts > 0].to_dict() if 'channel' in df.columns else {},
+            'lead_stages': df['lead_stage'].value_counts().loc[lambda counts: counts > 0].to_dict() if 'lead_stage' in df.columns else {},
             'avg_satisfaction': df['satisfaction_score'].mean() if 'satisfaction_score' in df.columns else 0,
             'resolution_rate': (df['resolved'].sum() / len(df) * 100) if 'resolved' in df.columns else 0,
             'avg_response_time': df['first_response_time'].mean() if 'first_response_time' in df.columns else 0,
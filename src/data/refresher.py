@@ -0,0 +1,114 @@
+"""
+Renovação de Snapshots em Segundo Plano
+Mantém atualizados os dados dos clientes ativos para que nenhuma sessão espere pela coleta
+"""
+
+import streamlit as st
+import threading
+import time
+import logging
+from typing import Dict
+
+from config.settings import CACHE_CONFIG, DATA_CONFIG
+from src.data.snapshots import get_snapshot_cache
+
+logger = logging.getLogger(__name__)
+
+class SnapshotRefresher:
+    """Thread única que renova, antes do TTL, os snapshots de cada cliente ativo"""
+
+    def __init__(self, ttl: int, tick: float, ahead_ratio: float, idle_timeout: float):
+        """
+        Args:
+            ttl: Tempo de vida dos snapshots (segundos)
+            tick: Intervalo entre verificações (segundos)
+            ahead_ratio: Fração do TTL a partir da qual o snapshot é renovado
+            idle_timeout: Tempo sem acesso até o cliente sair da lista (segundos)
+        """
+        self.ttl = ttl
+        self.tick = tick
+        self.refresh_age = ttl * ahead_ratio
+        self.idle_timeout = idle_timeout
+        self._tenants: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, collector):
+        """
+        Marca o cliente como ativo (chamado a cada carga de dados)
+
+        Args:
+            collector: DataCollector do cliente (reaproveitado nas renovações)
+        """
+        with self._lock:
+            self._tenants[collector.cache_key] = {
+                'collector': collector,
+                'last_seen': time.time()
+            }
+        self._ensure_running()
+
+    def unregister(self, cache_key: str):
+        """Remove o cliente da lista de renovação"""
+        with self._lock:
+            self._tenants.pop(cache_key, None)
+
+    def get_active_tenants(self) -> list:
+        """Chaves de cache dos clientes atualmente renovados"""
+        with self._lock:
+            return list(self._tenants)
+
+    def _ensure_running(self):
+        """Inicia a thread na primeira vez que um cliente é registrado"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+            self._thread.start()
+        logger.info("Renovador de snapshots iniciado")
+
+    def stop(self):
+        """Encerra a thread de renovação"""
+        self._stop.set()
+
+    def _run(self):
+        """Laço da thread (sem chamadas de UI do Streamlit)"""
+        while not self._stop.wait(self.tick):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"Erro no renovador de snapshots: {e}")
+
+    def run_once(self):
+        """Renova os snapshots próximos de expirar e descarta clientes inativos"""
+        now = time.time()
+        cache = get_snapshot_cache()
+
+        with self._lock:
+            idle = [key for key, tenant in self._tenants.items() if now - tenant['last_seen'] > self.idle_timeout]
+            for key in idle:
+                del self._tenants[key]
+            tenants = list(self._tenants.values())
+
+        for key in idle:
+            logger.info(f"Cliente inativo removido do renovador: {key}")
+
+        for tenant in tenants:
+            collector = tenant['collector']
+            snapshot = cache.peek(collector.cache_key)
+
+            if snapshot is not None and snapshot.age_seconds < self.refresh_age:
+                continue
+
+            collector.revalidate(snapshot)
+
+@st.cache_resource
+def get_refresher() -> SnapshotRefresher:
+    """Renovador único do processo (compartilhado entre sessões)"""
+    return SnapshotRefresher(
+        ttl=CACHE_CONFIG['default_ttl'],
+        tick=DATA_CONFIG['refresher_tick'],
+        ahead_ratio=DATA_CONFIG['refresh_ahead_ratio'],
+        idle_timeout=DATA_CONFIG['tenant_idle_timeout']
+    )
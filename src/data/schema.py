@@ -0,0 +1,153 @@
+"""
+Esquema de Colunas
+Converte cada coluna conhecida para o tipo final uma única vez, na ingestão
+"""
+
+import pandas as pd
+import logging
+from typing import Dict
+
+from config.settings import REGIONAL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Tipo final de cada coluna conhecida (inclui nomes alternativos usados pelas planilhas)
+COLUMN_SCHEMA = {
+    # Datas
+    'created_at': 'datetime',
+    'data_contato': 'datetime',
+    'lead_qualified_date': 'datetime',
+    'lead_converted_date': 'datetime',
+
+    # Contagens
+    'message_count': 'int',
+    'lead_score': 'int',
+
+    # Medidas
+    'satisfaction_score': 'float',
+    'first_response_time': 'float',
+    'resolution_time': 'float',
+    'frustration_level': 'float',
+    'nivel_frustracao': 'float',
+    'lead_value': 'float',
+
+    # Indicadores
+    'resolved': 'bool',
+    'escalated_to_human': 'bool',
+    'mentions_product': 'bool',
+    'mentions_price': 'bool',
+    'mentions_quantity': 'bool',
+
+    # Dimensões de baixa cardinalidade
+    'channel': 'category',
+    'canal_origem': 'category',
+    'status': 'category',
+    'status_conversa': 'category',
+    'lead_stage': 'category',
+    'agent_id': 'category',
+    'agent_responsavel': 'category',
+    'context_sentiment': 'category'
+}
+
+# Valores interpretados como verdadeiro (mesma regra de helpers.parse_bool)
+TRUE_VALUES = {'true', '1', 'sim', 'yes', 's', 'y', 'verdadeiro'}
+
+def _to_local_naive(values: pd.Series) -> pd.Series:
+    """Datas com fuso são convertidas para o horário regional, sem fuso"""
+    if getattr(values.dt, 'tz', None) is not None:
+        values = values.dt.tz_convert(REGIONAL_CONFIG['timezone']).dt.tz_localize(None)
+    return values
+
+def ensure_datetime(series: pd.Series) -> pd.Series:
+    """Retorna a série como datetime64 (sem conversão se já estiver tipada)"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return _to_local_naive(series)
+
+    try:
+        parsed = pd.to_datetime(series, errors='coerce')
+    except (ValueError, TypeError):
+        # Fusos horários misturados na mesma coluna
+        parsed = pd.to_datetime(series, errors='coerce', utc=True)
+
+    # O formato é inferido pelo primeiro valor; se valores preenchidos ficaram
+    # sem data, a coluna mistura formatos e cada valor é interpretado à parte
+    missing = parsed.isna()
+    if missing.any() and series[missing].astype(str).str.strip().ne('').any():
+        try:
+            parsed = pd.to_datetime(series, errors='coerce', format='mixed', utc=True)
+        except (ValueError, TypeError):
+            pass
+
+    return _to_local_naive(parsed)
+
+def ensure_numeric(series: pd.Series) -> pd.Series:
+    """Retorna a série como numérica (sem conversão se já estiver tipada)"""
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    return pd.to_numeric(series, errors='coerce')
+
+def _parse_int(series: pd.Series) -> pd.Series:
+    return ensure_numeric(series).round().astype('Int64')
+
+def _parse_float(series: pd.Series) -> pd.Series:
+    return ensure_numeric(series).astype('float64')
+
+def _parse_bool(series: pd.Series) -> pd.Series:
+    # Converter apenas os valores distintos (poucos) e mapear de volta
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return pd.Series(False, index=series.index, name=series.name)
+
+    truth = pd.Index(uniques).astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+    result = truth[codes] & (codes >= 0)
+    return pd.Series(result, index=series.index, name=series.name)
+
+def _parse_category(series: pd.Series) -> pd.Series:
+    return series.astype('category')
+
+# Conversor e verificação de "já tipado" por tipo
+PARSERS = {
+    'datetime': (ensure_datetime, pd.api.types.is_datetime64_dtype),
+    'int': (_parse_int, lambda dtype: isinstance(dtype, pd.Int64Dtype)),
+    'float': (_parse_float, lambda dtype: dtype == 'float64'),
+    'bool': (_parse_bool, pd.api.types.is_bool_dtype),
+    'category': (_parse_category, lambda dtype: isinstance(dtype, pd.CategoricalDtype))
+}
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str] = None) -> pd.DataFrame:
+    """
+    Converte as colunas conhecidas para o tipo final
+
+    Colunas que já estão no tipo correto não são processadas de novo, então a
+    função pode ser chamada sobre um frame parcialmente tipado (ex: após concat).
+
+    Args:
+        df: DataFrame bruto (normalmente tudo texto)
+        schema: Mapa coluna -> tipo (padrão COLUMN_SCHEMA)
+
+    Returns:
+        DataFrame tipado
+    """
+    if df.empty:
+        return df
+
+    schema = schema or COLUMN_SCHEMA
+    converted = {}
+
+    for col, kind in schema.items():
+        if col not in df.columns or not isinstance(df[col], pd.Series):
+            continue
+
+        parser, is_typed = PARSERS[kind]
+        if is_typed(df[col].dtype):
+            continue
+
+        try:
+            converted[col] = parser(df[col])
+        except Exception as e:
+            logger.warning(f"Não foi possível converter '{col}' para {kind}: {e}")
+
+    if not converted:
+        return df
+
+    return df.assign(**converted)
@@ -0,0 +1,314 @@
+"""
+Pontuação de Leads
+Compila as regras do lead score (LEAD_SCORING_CONFIG ou regras do cliente) em um
+plano de operações em coluna (numpy), sem laço por linha
+"""
+
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Union
+
+from config.settings import LEAD_SCORING_CONFIG, DATA_MAPPINGS
+
+logger = logging.getLogger(__name__)
+
+# Operadores aceitos nas faixas das regras
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+def numeric_values(df: pd.DataFrame, column: str) -> Optional[np.ndarray]:
+    """
+    Coluna como vetor float (vazios e valores não numéricos viram NaN)
+
+    Returns:
+        np.ndarray ou None se a coluna não existir
+    """
+    if column not in df.columns:
+        return None
+    values = pd.to_numeric(df[column], errors='coerce')
+    return values.to_numpy(dtype='float64', na_value=np.nan)
+
+def flag_values(df: pd.DataFrame, column: str) -> np.ndarray:
+    """
+    Coluna como vetor booleano, com a mesma regra de `if valor:` do Python
+
+    Colunas ausentes e vazios de tipos anuláveis (pd.NA) contam como falso.
+    """
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+
+    series = df[column]
+    if pd.api.types.is_bool_dtype(series.dtype) and not isinstance(series.dtype, pd.BooleanDtype):
+        return series.to_numpy()
+
+    values = series.to_numpy(dtype=object)
+    try:
+        return values.astype(bool)
+    except TypeError:
+        # pd.NA não tem valor lógico
+        return np.fromiter((value is not pd.NA and bool(value) for value in values), dtype=bool, count=len(values))
+
+class ScoringPlan:
+    """
+    Regras do lead score compiladas em operações em coluna
+
+    Cada regra vira uma função que recebe o DataFrame (e o cache de colunas
+    numéricas da avaliação) e devolve o vetor de pontos. A validação e a
+    montagem acontecem uma vez; avaliar custa o mesmo que o cálculo fixo.
+    """
+
+    def __init__(self, rules: List[Dict], min_score: float = 0, max_score: float = 100):
+        """
+        Args:
+            rules: Regras no formato de LEAD_SCORING_CONFIG['rules']
+            min_score: Menor score possível
+            max_score: Maior score possível
+
+        Raises:
+            ValueError: quando alguma regra é inválida
+        """
+        self.min_score = min_score
+        self.max_score = max_score
+        self._steps = []
+        all_points = []
+
+        for rule in rules:
+            step, points = self._compile_rule(rule)
+            if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in points):
+                raise ValueError(f"Pontos inválidos em '{rule['column']}': {points!r}")
+            self._steps.append(step)
+            all_points.extend(points)
+
+        # Score inteiro quando todos os pontos são inteiros (como no cálculo fixo)
+        self.dtype = np.int64 if all(isinstance(value, int) for value in all_points) else np.float64
+
+    @staticmethod
+    def _compile_rule(rule: Dict):
+        """Função de avaliação da regra e lista de pontos que ela pode somar"""
+        if not isinstance(rule, dict) or not isinstance(rule.get('column'), str):
+            raise ValueError(f"Regra sem coluna: {rule!r}")
+        column = rule['column']
+
+        if 'tiers' in rule:
+            tiers = rule['tiers']
+            if not tiers or any(len(tier) != 3 or tier[0] not in OPERATORS for tier in tiers):
+                raise ValueError(f"Faixas inválidas em '{column}': {tiers!r}")
+
+            operators = [OPERATORS[op] for op, _, _ in tiers]
+            thresholds = [float(threshold) for _, threshold, _ in tiers]
+            points = [tier_points for _, _, tier_points in tiers]
+
+            def step(df, numeric):
+                if column not in numeric:
+                    numeric[column] = numeric_values(df, column)
+                values = numeric[column]
+                if values is None:
+                    return 0
+                # NaN não atende nenhuma faixa
+                with np.errstate(invalid='ignore'):
+                    conditions = [op(values, threshold) for op, threshold in zip(operators, thresholds)]
+                return np.select(conditions, points, default=0)
+
+        elif 'in' in rule:
+            allowed = list(rule['in'])
+            points = rule.get('points', 0)
+
+            def step(df, numeric):
+                if column not in df.columns:
+                    return 0
+                return np.where(df[column].isin(allowed).to_numpy(), points, 0)
+
+        elif 'points' in rule:
+            points = rule['points']
+
+            def step(df, numeric):
+                return np.where(flag_values(df, column), points, 0)
+
+        else:
+            raise ValueError(f"Regra sem 'tiers', 'in' ou 'points' em '{column}'")
+
+        return step, points if isinstance(points, list) else [points]
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Lead score de cada conversa
+
+        Args:
+            df: DataFrame com colunas padronizadas (DataProcessor._standardize_columns)
+
+        Returns:
+            Série alinhada ao índice do DataFrame, limitada a [min_score, max_score]
+        """
+        score = np.zeros(len(df), dtype=self.dtype)
+        numeric = {}  # Colunas numéricas convertidas uma vez por avaliação
+
+        for step in self._steps:
+            score += step(df, numeric)
+
+        return pd.Series(np.clip(score, self.min_score, self.max_score), index=df.index, name='lead_score')
+
+# Planos compilados por hash das regras (compartilhados entre sessões)
+_plans: Dict[str, ScoringPlan] = {}
+_plans_lock = threading.Lock()
+
+def parse_scoring_rules(value: Union[str, List, Dict, None]) -> Optional[Dict]:
+    """
+    Normaliza as regras recebidas (JSON da planilha mestre, lista ou dict)
+
+    Aceita a lista de regras ou um dict com 'rules' (e opcionalmente
+    'min_score'/'max_score'). Limites ausentes usam os de LEAD_SCORING_CONFIG.
+
+    Returns:
+        Dict com 'rules', 'min_score' e 'max_score', ou None se vazio
+    """
+    if isinstance(value, str):
+        if not value.strip():
+            return None
+        value = json.loads(value)
+
+    if not value:
+        return None
+    if isinstance(value, list):
+        value = {'rules': value}
+    if not isinstance(value, dict) or not isinstance(value.get('rules'), list):
+        raise ValueError("Regras devem ser uma lista ou um objeto com 'rules'")
+
+    return {
+        'rules': value['rules'],
+        'min_score': value.get('min_score', LEAD_SCORING_CONFIG['min_score']),
+        'max_score': value.get('max_score', LEAD_SCORING_CONFIG['max_score'])
+    }
+
+def scoring_rules_key(rules: Union[str, List, Dict, None] = None) -> str:
+    """
+    Hash das regras do cliente (regras vazias equivalem às padrão)
+
+    Returns:
+        Hash md5 em hexadecimal
+    """
+    if not rules or (isinstance(rules, str) and not rules.strip()):
+        rules = None
+
+    raw = rules if isinstance(rules, str) else json.dumps(rules, sort_keys=True, default=str)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+def get_scoring_plan(rules: Union[str, List, Dict, None] = None) -> ScoringPlan:
+    """
+    Plano compilado para as regras (compilado uma vez, guardado pelo hash das regras)
+
+    Regras inválidas são registradas no log e o plano padrão é usado.
+
+    Args:
+        rules: Regras do cliente (None = LEAD_SCORING_CONFIG)
+
+    Returns:
+        ScoringPlan pronto para avaliar
+    """
+    if not rules or (isinstance(rules, str) and not rules.strip()):
+        rules = None
+
+    key = scoring_rules_key(rules)
+
+    with _plans_lock:
+        plan = _plans.get(key)
+    if plan is not None:
+        return plan
+
+    try:
+        config = parse_scoring_rules(rules) or LEAD_SCORING_CONFIG
+        plan = ScoringPlan(config['rules'], config['min_score'], config['max_score'])
+        logger.info(f"Regras de score compiladas ({len(config['rules'])} regras, hash {key[:8]})")
+    except (ValueError, TypeError) as e:
+        if rules is None:
+            raise
+        # O plano padrão fica associado às regras inválidas (aviso uma vez só)
+        logger.warning(f"Regras de score inválidas (hash {key[:8]}), usando as padrão: {e}")
+        plan = get_scoring_plan()
+
+    with _plans_lock:
+        return _plans.setdefault(key, plan)
+
+# Etapas do funil (na ordem configurada), etapas finais (não mudam mais) e
+# regra que definiu a etapa de cada lead
+LEAD_STAGES = list(DATA_MAPPINGS['lead_stages'])
+FINAL_STAGES = ['convertido', 'perdido']
+STAGE_RULES = {
+    'mantido': 'Etapa final mantida (convertido/perdido)',
+    'convertido_score': 'Score alto com conversa resolvida',
+    'qualificado_score': 'Score de qualificação atingido',
+    'perdido_frustracao': 'Score baixo com frustração alta',
+    'padrao': 'Nenhum critério atendido'
+}
+
+def compute_lead_stage(df: pd.DataFrame, stages: Dict = None):
+    """
+    Etapa do lead e regra que a definiu, em uma única seleção vetorizada
+
+    Ordem das regras (vale a primeira atendida): etapa final mantida, score
+    alto + resolvido -> convertido, score de qualificação -> qualificado,
+    score baixo + frustração alta -> perdido, senão novo. A seleção trabalha
+    com os códigos das categorias, sem montar vetores de texto.
+
+    Args:
+        df: DataFrame com lead_score já calculado
+        stages: Limiares (padrão LEAD_SCORING_CONFIG['stages'])
+
+    Returns:
+        Tupla (etapa, regra) de Séries categóricas alinhadas ao índice do DataFrame
+    """
+    stages = stages or LEAD_SCORING_CONFIG['stages']
+    stage_code = {stage: code for code, stage in enumerate(LEAD_STAGES)}
+
+    # Códigos da etapa atual nas etapas configuradas (-1 = vazia ou fora delas);
+    # coluna categórica é só recodificada, sem comparar o texto de cada linha
+    if 'lead_stage' in df.columns:
+        current = pd.Categorical(df['lead_stage'], categories=LEAD_STAGES).codes
+    else:
+        current = np.full(len(df), stage_code['novo'], dtype=np.int8)
+
+    score = numeric_values(df, 'lead_score')
+    if score is None:
+        score = np.zeros(len(df))
+    frustration = numeric_values(df, 'frustration_level')
+    if frustration is None:
+        frustration = np.zeros(len(df))
+
+    with np.errstate(invalid='ignore'):
+        conditions = [
+            np.isin(current, [stage_code[stage] for stage in FINAL_STAGES]),
+            (score >= stages['convert_score']) & flag_values(df, 'resolved'),
+            score >= stages['qualify_score'],
+            (score < stages['lost_score']) & (frustration > stages['lost_frustration'])
+        ]
+
+    targets = [current, stage_code['convertido'], stage_code['qualificado'], stage_code['perdido']]
+    stage = np.select(conditions, targets, default=stage_code['novo'])
+    rule = np.select(conditions, list(range(len(conditions))), default=len(conditions))
+
+    return (
+        pd.Series(pd.Categorical.from_codes(stage, categories=LEAD_STAGES), index=df.index, name='lead_stage'),
+        pd.Series(pd.Categorical.from_codes(rule, categories=list(STAGE_RULES)), index=df.index, name='lead_stage_rule')
+    )
+
+def compute_lead_score(df: pd.DataFrame, rules: Union[str, List, Dict, None] = None) -> pd.Series:
+    """
+    Lead score (entre min_score e max_score) de cada conversa
+
+    Args:
+        df: DataFrame com colunas padronizadas (DataProcessor._standardize_columns)
+        rules: Regras do cliente (None = LEAD_SCORING_CONFIG)
+
+    Returns:
+        Série alinhada ao índice do DataFrame
+    """
+    return get_scoring_plan(rules).evaluate(df)
@@ -0,0 +1,96 @@
+"""
+Coalescência de Requisições (single-flight)
+Garante uma única coleta em andamento por chave; chamadas simultâneas recebem o mesmo resultado
+"""
+
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Execuções compartilhadas por chave (ex: ID da planilha)"""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> Optional[Future]:
+        """
+        Reserva a execução da chave
+
+        Returns:
+            Future a ser concluído com complete(), ou None se já houver execução em andamento
+        """
+        with self._lock:
+            if key in self._calls:
+                return None
+            future = Future()
+            self._calls[key] = future
+            return future
+
+    def complete(self, key: str, future: Future, fn: Callable[[], Any]) -> Future:
+        """
+        Executa fn e publica o resultado (ou a exceção) para todos que aguardam
+
+        Args:
+            key: Chave reservada com claim()
+            future: Future retornado por claim()
+            fn: Função que produz o resultado
+
+        Returns:
+            O próprio future, já concluído
+        """
+        try:
+            result = fn()
+        except BaseException as e:
+            self._release(key)
+            future.set_exception(e)
+        else:
+            self._release(key)
+            future.set_result(result)
+        return future
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Executa fn uma única vez por chave, mesmo com chamadas simultâneas
+
+        A primeira chamada executa; as demais aguardam e recebem o mesmo
+        resultado (ou a mesma exceção).
+
+        Args:
+            key: Chave da execução
+            fn: Função que produz o resultado
+
+        Returns:
+            Resultado de fn
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if leader:
+            self.complete(key, future, fn)
+        else:
+            logger.info(f"Aguardando coleta em andamento para {key}")
+
+        return future.result()
+
+    def in_flight(self, key: str) -> bool:
+        """Verifica se há execução em andamento para a chave"""
+        with self._lock:
+            return key in self._calls
+
+    def get_keys(self) -> List[str]:
+        """Chaves com execução em andamento"""
+        with self._lock:
+            return list(self._calls)
+
+    def _release(self, key: str):
+        with self._lock:
+            self._calls.pop(key, None)
@@ -0,0 +1,146 @@
+"""
+Cache de Snapshots por Planilha
+Mantém em memória, compartilhado entre sessões, o último DataFrame carregado de cada cliente
+"""
+
+import streamlit as st
+import pandas as pd
+import copy
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config.settings import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class Snapshot:
+    """Dados carregados de uma fonte em um determinado momento"""
+
+    def __init__(self, df: pd.DataFrame, fetched_at: Optional[float] = None,
+                 revision: str = '', meta: Optional[Dict[str, Any]] = None, nbytes: Optional[int] = None):
+        """
+        Args:
+            df: DataFrame carregado
+            fetched_at: Timestamp (time.time) da coleta
+            revision: Marcador de versão da fonte no momento da coleta
+            meta: Metadados da fonte (ex: estado da leitura incremental)
+            nbytes: Memória ocupada já conhecida (None = medir o DataFrame)
+        """
+        self.df = df
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.revision = revision
+        self.meta = meta or {}
+        if nbytes is None:
+            nbytes = int(df.memory_usage(index=True, deep=True).sum()) if not df.empty else 0
+        self.nbytes = nbytes
+
+    @property
+    def age_seconds(self) -> float:
+        """Idade do snapshot em segundos"""
+        return max(0.0, time.time() - self.fetched_at)
+
+    def renewed(self) -> 'Snapshot':
+        """Mesmo conteúdo com horário de coleta atualizado (fonte sem alterações)"""
+        snapshot = copy.copy(self)
+        snapshot.fetched_at = time.time()
+        return snapshot
+
+class SnapshotCache:
+    """Cache LRU de snapshots com limite de memória em bytes"""
+
+    def __init__(self, max_bytes: int, ttl: int):
+        """
+        Args:
+            max_bytes: Orçamento total de memória dos snapshots
+            ttl: Tempo de vida (segundos) antes de um snapshot ser considerado velho
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Snapshot]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        """Retorna o snapshot da chave (mesmo se velho) e o marca como recente"""
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def peek(self, key: str) -> Optional[Snapshot]:
+        """Retorna o snapshot da chave sem contar acesso nem alterar a ordem LRU"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def is_fresh(self, snapshot: Snapshot) -> bool:
+        """Verifica se o snapshot ainda está dentro do TTL"""
+        return snapshot.age_seconds < self.ttl
+
+    def put(self, key: str, snapshot: Snapshot):
+        """Armazena snapshot e remove os menos usados até caber no orçamento"""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.nbytes
+
+            self._entries[key] = snapshot
+            self._total_bytes += snapshot.nbytes
+
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+                logger.info(f"Snapshot removido do cache (LRU): {evicted_key}")
+
+            if snapshot.nbytes > self.max_bytes:
+                logger.warning(
+                    f"Snapshot de {key} ({snapshot.nbytes} bytes) excede o orçamento "
+                    f"do cache ({self.max_bytes} bytes)"
+                )
+
+    def invalidate(self, key: str = None):
+        """Remove o snapshot de uma chave ou todos"""
+        with self._lock:
+            if key:
+                snapshot = self._entries.pop(key, None)
+                if snapshot is not None:
+                    self._total_bytes -= snapshot.nbytes
+            else:
+                self._entries.clear()
+                self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+@st.cache_resource
+def get_snapshot_cache() -> SnapshotCache:
+    """Instância única do cache, compartilhada por todas as sessões do processo"""
+    return SnapshotCache(
+        max_bytes=CACHE_CONFIG['snapshot_max_bytes'],
+        ttl=CACHE_CONFIG['default_ttl']
+    )
+
+@st.cache_resource
+def get_enriched_cache() -> SnapshotCache:
+    """Cache dos dados já enriquecidos pelo DataProcessor, por cliente e versão dos dados"""
+    return SnapshotCache(
+        max_bytes=CACHE_CONFIG['enriched_max_bytes'],
+        ttl=CACHE_CONFIG['default_ttl']
+    )
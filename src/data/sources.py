@@ -0,0 +1,942 @@
+"""
+Fontes de Dados do Dashboard
+Backends intercambiáveis usados pelo DataCollector (Google Sheets, CSV, Parquet, JSON-lines)
+"""
+
+import os
+import re
+import time
+import hashlib
+import contextvars
+import pandas as pd
+import gspread
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import DATA_CONFIG
+from src.data.ingest import (
+    values_to_dataframe, blocks_to_matrix, matrix_to_dataframe, frame_from_matrix, ColumnarBuffer
+)
+from src.data.schema import apply_schema
+from src.data.snapshots import Snapshot
+from src.data.worksheets import worksheet_resolver, match_worksheet_titles
+from src.utils.quota import get_status_code
+
+logger = logging.getLogger(__name__)
+
+class DataSourceError(Exception):
+    """Erro esperado da fonte de dados (ex: aba inexistente, arquivo ausente)"""
+
+# Prefixos das revisões de planilha (data de modificação no Drive ou impressão digital)
+DRIVE_REVISION_PREFIX = 'drive:'
+FINGERPRINT_REVISION_PREFIX = 'fp:'
+
+# Planilhas cujos metadados do Drive não estão acessíveis (usam impressão digital)
+# e status do Drive que indicam falta de acesso (não temporários)
+_drive_unavailable = set()
+DRIVE_UNAVAILABLE_STATUSES = (403, 404)
+
+def split_list(value) -> List[str]:
+    """Lista configurada em uma célula (separada por vírgula, ponto e vírgula ou quebra de linha)"""
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = re.split(r'[,;\n]', value or '')
+    return [item.strip() for item in items if item and item.strip()]
+
+def row_hash(row: List[str], width: int) -> str:
+    """Hash de uma linha normalizada para a largura do cabeçalho"""
+    cells = list(row[:width]) + [''] * max(0, width - len(row))
+    return hashlib.md5('\x1f'.join(cells).encode('utf-8')).hexdigest()
+
+def sample_positions(row_count: int, size: int) -> List[int]:
+    """
+    Linhas da planilha (numeradas a partir de 1) amostradas para detectar edições
+
+    Espalhadas por igual entre a primeira linha de dados e a penúltima (a última
+    já é conferida pela leitura incremental).
+    """
+    last = row_count - 1
+    if last < 2 or size <= 0:
+        return []
+    if last - 1 <= size:
+        return list(range(2, last + 1))
+    return sorted({2 + (last - 2) * i // max(size - 1, 1) for i in range(size)})
+
+def rows_hash(rows: List[List[str]], width: int) -> str:
+    """Hash de um conjunto de linhas normalizadas para a mesma largura"""
+    return hashlib.md5(''.join(row_hash(row, width) for row in rows).encode('utf-8')).hexdigest()
+
+def update_column_hash(digest, cells: Iterable[str]):
+    """Acrescenta células de uma coluna ao hash (permite calcular bloco a bloco)"""
+    digest.update(''.join(f"{cell}\x1f" for cell in cells).encode('utf-8'))
+
+def column_hash(cells: Iterable[str]) -> str:
+    """Hash das células de uma coluna, na ordem das linhas"""
+    digest = hashlib.md5()
+    update_column_hash(digest, cells)
+    return digest.hexdigest()
+
+class DataSource:
+    """Interface comum das fontes de dados de um cliente"""
+
+    source_type = ''
+
+    def __init__(self, location: str):
+        """
+        Args:
+            location: ID da planilha ou caminho do arquivo
+        """
+        self.location = location
+
+    def load(self) -> pd.DataFrame:
+        """
+        Carrega os dados brutos da fonte
+
+        Returns:
+            DataFrame com os dados (vazio se não houver linhas)
+
+        Raises:
+            DataSourceError: quando a fonte não existe ou não tem dados utilizáveis
+        """
+        raise NotImplementedError
+
+    def fetch(self, previous: Optional[Snapshot] = None) -> Snapshot:
+        """
+        Carrega um novo snapshot da fonte
+        
+        Args:
+            previous: Snapshot anterior da mesma fonte (permite leitura incremental)
+        
+        Returns:
+            Snapshot com os dados atuais
+        """
+        revision = self.get_revision()
+        if self._is_unchanged(previous, revision):
+            return self._keep(previous)
+
+        df = apply_schema(self.load())
+        return Snapshot(df, revision=revision, meta={'source': self.describe()})
+
+    def get_revision(self) -> str:
+        """Marcador de versão atual da fonte (vazio se não suportado)"""
+        return ''
+
+    def _is_unchanged(self, previous: Optional[Snapshot], revision: str) -> bool:
+        """Verifica se a fonte continua na mesma revisão do snapshot anterior"""
+        if not DATA_CONFIG['check_revision'] or previous is None or not revision:
+            return False
+        return previous.revision == revision and previous.meta.get('source') == self.describe()
+
+    def _keep(self, previous: Snapshot) -> Snapshot:
+        """Reaproveita o snapshot anterior quando a fonte não mudou"""
+        logger.info(f"Sem alterações em {self.describe()} (revisão {previous.revision}) - snapshot mantido")
+        return previous.renewed()
+
+    def describe(self) -> str:
+        """Descrição curta da fonte para logs"""
+        return f"{self.source_type}:{self.location}"
+
+class GoogleSheetsSource(DataSource):
+    """Planilha Google Sheets (backend padrão)"""
+
+    source_type = 'sheets'
+
+    def __init__(self, location: str, client=None, worksheet: str = None, columns: List[str] = None):
+        """
+        Args:
+            location: ID da planilha
+            client: Cliente gspread autorizado
+            worksheet: Título da aba (padrão: primeira de WORKSHEET_NAMES que existir)
+            columns: Colunas a ler (None = todas)
+        """
+        super().__init__(location)
+        self.client = client
+        self.worksheet = worksheet
+        self.columns = list(columns) if columns else None
+        self.preferred = [worksheet] if worksheet else None
+        self.drive_revision = None  # Revisão do Drive já consultada (compartilhada entre abas)
+
+    def describe(self) -> str:
+        if self.worksheet:
+            return f"{self.source_type}:{self.location}/{self.worksheet}"
+        return super().describe()
+
+    def _open_worksheet(self, revision: str = None):
+        """
+        Retorna a aba de dados (resolvida uma vez por planilha e reaproveitada)
+
+        Args:
+            revision: Revisão atual; se mudou, os metadados da aba são relidos
+                (row_count decide a leitura em blocos)
+        """
+        worksheet = worksheet_resolver.resolve(self.client, self.location, self.preferred, revision)
+        if not worksheet:
+            if self.worksheet:
+                raise DataSourceError(f"Aba '{self.worksheet}' não encontrada na planilha {self.location}")
+            raise DataSourceError("Nenhuma aba de dados encontrada na planilha")
+        return worksheet
+
+    def load(self) -> pd.DataFrame:
+        return self.fetch().df
+
+    def fetch(self, previous: Optional[Snapshot] = None) -> Snapshot:
+        if not self.client:
+            return Snapshot(pd.DataFrame())
+
+        try:
+            return self._fetch_revision(previous)
+        except gspread.exceptions.APIError as e:
+            # A aba guardada pode ter sido renomeada ou removida: resolver de novo
+            if e.response.status_code not in (400, 404):
+                raise
+            if worksheet_resolver.get_resolved_id(self.location, self.preferred) is None:
+                raise
+            worksheet_resolver.invalidate(self.location)
+            return self._fetch_revision(previous)
+
+    def _fetch_revision(self, previous: Optional[Snapshot]) -> Snapshot:
+        """Consulta a revisão e só lê a aba quando a planilha mudou"""
+        revision = self.get_revision() if DATA_CONFIG['check_revision'] else ''
+        if self._is_unchanged(previous, revision):
+            return self._keep(previous)
+
+        # Revisão diferente da anterior: a planilha mudou, mesmo sem linhas novas
+        changed = bool(previous is not None and revision and previous.revision != revision)
+        snapshot = self._fetch_worksheet(self._open_worksheet(revision), previous, changed)
+        # Revisão consultada antes da leitura: edições durante a leitura geram nova recarga
+        snapshot.revision = revision or snapshot.revision
+        return snapshot
+
+    def get_revision(self) -> str:
+        """
+        Revisão atual da planilha, sem baixar os dados
+        
+        Usa a data de modificação do arquivo no Drive (uma chamada pequena). Se o
+        Drive não estiver acessível, usa uma impressão digital do cabeçalho e do
+        número de linhas preenchidas na coluna A.
+        
+        Returns:
+            Marcador de revisão ou '' se não for possível obter
+        """
+        if not self.client:
+            return ''
+
+        drive_revision = self.drive_revision if self.drive_revision is not None else self.get_drive_revision()
+        if drive_revision:
+            return drive_revision
+
+        header_values, first_column = self._open_worksheet().batch_get(['1:1', 'A:A'])
+        headers = header_values[0] if header_values else []
+        return f"{FINGERPRINT_REVISION_PREFIX}{row_hash(headers, len(headers))[:8]}-{len(first_column)}"
+
+    def get_drive_revision(self) -> str:
+        """Data de modificação da planilha no Drive ('' se o Drive não estiver acessível)"""
+        if self.location in _drive_unavailable:
+            return ''
+
+        try:
+            metadata = self.client.get_file_drive_metadata(self.location)
+            if metadata.get('modifiedTime'):
+                return DRIVE_REVISION_PREFIX + metadata['modifiedTime']
+        except gspread.exceptions.APIError as e:
+            # Só falta de acesso é permanente; 429/5xx valem apenas para esta consulta
+            if get_status_code(e) in DRIVE_UNAVAILABLE_STATUSES:
+                logger.warning(f"Metadados do Drive indisponíveis para {self.location} ({e}) - usando impressão digital")
+                _drive_unavailable.add(self.location)
+            else:
+                logger.warning(f"Falha temporária nos metadados do Drive para {self.location} ({e}) - usando impressão digital")
+
+        return ''
+
+    def _is_unchanged(self, previous: Optional[Snapshot], revision: str) -> bool:
+        if not super()._is_unchanged(previous, revision):
+            return False
+
+        # Nem a impressão digital nem as leituras incrementais garantem que edições
+        # em linhas existentes foram lidas: confiar na revisão só até a próxima
+        # recarga completa periódica
+        full_loaded_at = previous.meta.get('full_loaded_at')
+        if full_loaded_at is None:
+            return not revision.startswith(FINGERPRINT_REVISION_PREFIX)
+        return time.time() - full_loaded_at <= DATA_CONFIG['incremental_max_age']
+
+    def _fetch_worksheet(self, worksheet, previous: Optional[Snapshot], changed: bool = False) -> Snapshot:
+        """
+        Lê a aba (incremental quando possível, senão completa)
+
+        Args:
+            worksheet: Aba a ler
+            previous: Snapshot anterior (permite leitura incremental)
+            changed: A revisão da planilha mudou desde o snapshot anterior
+        """
+        # Conversas só crescem por linhas novas no final: tentar ler apenas o trecho novo
+        if previous is not None and DATA_CONFIG['incremental_fetch']:
+            snapshot = self._fetch_appended(worksheet, previous, changed)
+            if snapshot is not None:
+                return snapshot
+
+        # Abas grandes: leitura em blocos, sem manter todos os valores brutos em memória
+        if self._should_stream(worksheet):
+            headers = worksheet.row_values(1)
+            plan = self._plan_projection(headers) if self.columns else None
+            return self._fetch_streamed(worksheet, headers, plan)
+
+        # Ler só as colunas usadas pelo dashboard
+        if self.columns:
+            snapshot = self._fetch_projected(worksheet, previous)
+            if snapshot is not None:
+                return snapshot
+
+        # Carregar todos os dados
+        all_values = worksheet.get_all_values()
+        df = apply_schema(values_to_dataframe(all_values))
+
+        if all_values:
+            headers = all_values[0]
+            positions = sample_positions(len(all_values), DATA_CONFIG['incremental_sample_rows'])
+            samples = {row: all_values[row - 1] for row in positions}
+            check = self._check_column(headers)
+            check_hash = None
+            if check is not None:
+                check_hash = column_hash(row[check] if check < len(row) else '' for row in all_values[1:])
+            meta = self._incremental_state(
+                worksheet, headers, len(all_values), all_values[-1], len(headers), samples=samples,
+                check=(check, check_hash)
+            )
+        else:
+            meta = {'source': self.describe()}
+        return Snapshot(df, revision=self._state_revision(meta), meta=meta)
+
+    def _plan_projection(self, headers: List[str]) -> Optional[dict]:
+        """
+        Intervalos de colunas a ler para obter as colunas desejadas
+
+        Colunas vizinhas são agrupadas em um único intervalo (ex: A:C, F:F).
+
+        Returns:
+            Plano com índices, intervalos e larguras, ou None se a projeção não
+            reduzir a leitura (nenhuma ou todas as colunas selecionadas)
+        """
+        wanted = set(self.columns)
+        indices = [i for i, name in enumerate(headers) if name.strip() in wanted]
+        if not indices or len(indices) == len(headers):
+            return None
+
+        spans = []
+        for index in indices:
+            if spans and spans[-1][1] == index - 1:
+                spans[-1][1] = index
+            else:
+                spans.append([index, index])
+
+        def column_letter(index: int) -> str:
+            return gspread.utils.rowcol_to_a1(1, index + 1).rstrip('0123456789')
+
+        return {
+            'indices': indices,
+            'spans': [[column_letter(start), column_letter(end)] for start, end in spans],
+            'widths': [end - start + 1 for start, end in spans]
+        }
+
+    def _fetch_projected(self, worksheet, previous: Optional[Snapshot]) -> Optional[Snapshot]:
+        """
+        Lê apenas as colunas desejadas, em uma leitura em lote (cabeçalho + intervalos)
+
+        O plano de colunas do snapshot anterior é reaproveitado; sem ele, o
+        cabeçalho é lido antes. Se o cabeçalho mudou, o plano é refeito.
+
+        Returns:
+            Snapshot ou None se a leitura completa for mais adequada
+        """
+        state = previous.meta if previous is not None else {}
+        plan = None
+        if state.get('source') == self.describe() and state.get('projected_columns') == self.columns:
+            plan = state.get('projection')
+            expected_hash = state.get('header_hash')
+
+        if plan is None:
+            headers = worksheet.row_values(1)
+            plan = self._plan_projection(headers)
+            if plan is None:
+                return None
+            expected_hash = row_hash(headers, len(headers))
+
+        for _ in range(2):
+            ranges = [f"{start}:{end}" for start, end in plan['spans']]
+            header_values, *blocks = worksheet.batch_get(['1:1'] + ranges)
+            headers = header_values[0] if header_values else []
+
+            if row_hash(headers, len(headers)) == expected_hash:
+                break
+
+            logger.info("Cabeçalho alterado - refazendo seleção de colunas")
+            plan = self._plan_projection(headers)
+            if plan is None:
+                return None
+            expected_hash = row_hash(headers, len(headers))
+        else:
+            return None
+
+        matrix = blocks_to_matrix(blocks, plan['widths'])
+        selected = [headers[i] for i in plan['indices']]
+        df = apply_schema(matrix_to_dataframe(selected, matrix[1:])) if len(matrix) > 1 else pd.DataFrame()
+
+        row_count = max(len(matrix), 1)
+        positions = sample_positions(row_count, DATA_CONFIG['incremental_sample_rows'])
+        samples = {row: list(matrix[row - 1]) for row in positions}
+        check = self._check_column(headers, plan)
+        check_hash = column_hash(matrix[1:, plan['indices'].index(check)].tolist()) if check is not None else None
+        meta = self._incremental_state(
+            worksheet, headers, row_count, list(matrix[-1]) if len(matrix) else [], len(selected), plan, samples,
+            check=(check, check_hash)
+        )
+        logger.info(f"Leitura projetada: {len(selected)} de {len(headers)} colunas em {self.describe()}")
+        return Snapshot(df, revision=self._state_revision(meta), meta=meta)
+
+    @staticmethod
+    def _should_stream(worksheet) -> bool:
+        """Se a aba deve ser lida em blocos (pelo tamanho da grade)"""
+        if not DATA_CONFIG['streaming_ingest']:
+            return False
+        return getattr(worksheet, 'row_count', 0) > DATA_CONFIG['stream_min_rows']
+
+    def _fetch_streamed(self, worksheet, headers: List[str], plan: Optional[dict] = None) -> Snapshot:
+        """
+        Lê a aba em blocos de batch_size linhas
+
+        Cada bloco é convertido, tipado e copiado para um buffer colunar
+        pré-alocado pelo tamanho da grade; depois disso os valores brutos do
+        bloco são descartados. O pico de memória fica em uma cópia tipada dos
+        dados mais um bloco, em vez da lista de linhas inteira mais o DataFrame.
+
+        Args:
+            worksheet: Aba a ler
+            headers: Cabeçalho (linha 1) da aba
+            plan: Plano de colunas projetadas (None = todas as colunas)
+
+        Returns:
+            Snapshot com o estado incremental da leitura
+        """
+        if not headers:
+            logger.warning("Planilha sem dados suficientes")
+            return Snapshot(pd.DataFrame(), meta={'source': self.describe()})
+
+        if plan:
+            spans, widths = plan['spans'], plan['widths']
+            selected = [headers[i] for i in plan['indices']]
+        else:
+            last_col = gspread.utils.rowcol_to_a1(1, len(headers)).rstrip('0123456789')
+            spans, widths = [['A', last_col]], [len(headers)]
+            selected = headers
+
+        batch_size = DATA_CONFIG['batch_size']
+        grid_rows = worksheet.row_count
+        buffer = ColumnarBuffer(grid_rows - 1)
+        row_count, tail_row = 1, list(selected)
+        start, n_chunks = 2, 0
+
+        # Hash da coluna conferida, calculado bloco a bloco
+        check = self._check_column(headers, plan)
+        check_position = (plan['indices'].index(check) if plan else check) if check is not None else None
+        check_digest = hashlib.md5()
+
+        while True:
+            end = start + batch_size - 1
+            blocks = worksheet.batch_get([f"{first}{start}:{last}{end}" for first, last in spans])
+            chunk = blocks_to_matrix(blocks, widths)
+            n_chunks += 1
+
+            if len(chunk):
+                row_count = start + len(chunk) - 1
+                tail_row = list(chunk[-1])
+                if check_position is not None:
+                    update_column_hash(check_digest, chunk[:, check_position].tolist())
+                buffer.append(apply_schema(frame_from_matrix(selected, chunk)))
+
+            # Bloco incompleto no fim da grade: fim dos dados (blocos cheios
+            # continuam mesmo se a grade conhecida estiver desatualizada)
+            if len(chunk) < batch_size and end >= grid_rows:
+                break
+            start = end + 1
+
+        df = buffer.to_frame()
+        if df.empty:
+            logger.warning("Nenhuma linha de dados válida encontrada")
+
+        # Os blocos já foram descartados: as linhas de amostra vêm em mais uma leitura
+        positions = sample_positions(row_count, DATA_CONFIG['incremental_sample_rows'])
+        samples = dict(zip(positions, self._read_rows(worksheet, positions, spans, widths)))
+
+        check_hash = check_digest.hexdigest() if check is not None else None
+        meta = self._incremental_state(
+            worksheet, headers, row_count, tail_row, len(selected), plan, samples, check=(check, check_hash)
+        )
+        logger.info(f"Leitura em blocos: {len(df)} linhas em {n_chunks} blocos em {self.describe()}")
+        return Snapshot(df, revision=self._state_revision(meta), meta=meta)
+
+    @staticmethod
+    def _row_ranges(positions: List[int], spans: List[List[str]]) -> List[str]:
+        """Intervalos de cada linha (um por bloco de colunas)"""
+        return [f"{first}{row}:{last}{row}" for row in positions for first, last in spans]
+
+    @staticmethod
+    def _split_rows(blocks: List, n_rows: int, widths: List[int]) -> List[List[str]]:
+        """Linhas lidas com _row_ranges (linhas vazias viram células vazias)"""
+        rows = []
+        for index in range(n_rows):
+            row_blocks = blocks[index * len(widths):(index + 1) * len(widths)]
+            matrix = blocks_to_matrix(row_blocks, widths)
+            rows.append(list(matrix[0]) if len(matrix) else [''] * sum(widths))
+        return rows
+
+    def _read_rows(self, worksheet, positions: List[int], spans: List[List[str]], widths: List[int]) -> List[List[str]]:
+        """Lê linhas avulsas em uma única leitura em lote"""
+        if not positions:
+            return []
+        return self._split_rows(worksheet.batch_get(self._row_ranges(positions, spans)), len(positions), widths)
+
+    @staticmethod
+    def _check_column(headers: List[str], plan: Optional[dict] = None) -> Optional[int]:
+        """
+        Coluna (índice no cabeçalho) relida inteira quando a planilha muda com linhas novas
+
+        A de DATA_CONFIG['incremental_check_column'] se estiver entre as lidas,
+        senão a primeira coluna lida.
+        """
+        indices = plan['indices'] if plan else list(range(len(headers)))
+        for index in indices:
+            if headers[index].strip() == DATA_CONFIG['incremental_check_column']:
+                return index
+        return indices[0] if indices else None
+
+    @staticmethod
+    def _state_revision(state: dict) -> str:
+        """Revisão derivada do estado incremental (cabeçalho, linhas e última linha)"""
+        if 'header_hash' not in state:
+            return ''
+        return f"{state['header_hash'][:8]}-{state['row_count']}-{state['tail_hash'][:8]}"
+
+    def _incremental_state(self, worksheet, headers: List[str], row_count: int, tail_row: List[str],
+                           tail_width: int, projection: Optional[dict] = None,
+                           samples: Optional[Dict[int, List[str]]] = None, check=(None, None)) -> dict:
+        """
+        Estado necessário para a próxima leitura incremental
+
+        Args:
+            check: (índice da coluna conferida, hash da coluna nas linhas de dados)
+        """
+        sample_rows = sorted(samples or {})
+        return {
+            'source': self.describe(),
+            'worksheet': worksheet.title,
+            'row_count': row_count,  # Inclui o cabeçalho
+            'width': len(headers),
+            'header_hash': row_hash(headers, len(headers)),
+            'tail_hash': row_hash(tail_row, tail_width),
+            'full_loaded_at': time.time(),
+            'projected_columns': self.columns,
+            'projection': projection,
+            # Linhas anteriores conferidas a cada leitura incremental
+            'sample_rows': sample_rows,
+            'sample_hash': rows_hash([samples[row] for row in sample_rows], tail_width),
+            # Coluna relida inteira quando a revisão muda com linhas novas
+            'check_column': check[0],
+            'check_hash': check[1]
+        }
+
+    def _fetch_appended(self, worksheet, previous: Snapshot, changed: bool = False) -> Optional[Snapshot]:
+        """
+        Lê apenas as linhas adicionadas desde o snapshot anterior
+        
+        Uma única leitura em lote traz o cabeçalho e o intervalo (ou os intervalos
+        de colunas projetadas) a partir da última linha conhecida. Se o cabeçalho
+        ou essa última linha mudaram, as linhas anteriores não são mais confiáveis
+        e retorna None (recarga completa). Também retorna None quando a revisão
+        mudou sem linhas novas (edição em linhas existentes). Quando a revisão
+        mudou com linhas novas, a mesma leitura traz a coluna conferida inteira
+        (edições fora da amostra na mesma revisão também forçam a recarga).
+        
+        Args:
+            worksheet: Aba a ler
+            previous: Snapshot anterior com o estado incremental
+            changed: A revisão da planilha mudou desde o snapshot anterior
+        
+        Returns:
+            Snapshot atualizado ou None se for necessário recarregar tudo
+        """
+        state = previous.meta
+        if state.get('source') != self.describe() or state.get('worksheet') != worksheet.title:
+            return None
+        if not state.get('width') or state.get('projected_columns') != self.columns:
+            return None
+
+        # Recarga completa periódica para refletir edições no meio da planilha
+        if time.time() - state['full_loaded_at'] > DATA_CONFIG['incremental_max_age']:
+            return None
+
+        last_row = state['row_count']
+        projection = state.get('projection')
+        if projection:
+            spans, widths = projection['spans'], projection['widths']
+        else:
+            last_col = gspread.utils.rowcol_to_a1(1, state['width']).rstrip('0123456789')
+            spans, widths = [['A', last_col]], [state['width']]
+
+        sample_rows = state.get('sample_rows') or []
+        check = state.get('check_column')
+        if changed and (check is None or state.get('check_hash') is None):
+            return None
+
+        ranges = ['1:1'] + [f"{start}{last_row}:{end}" for start, end in spans] + self._row_ranges(sample_rows, spans)
+        if changed:
+            check_letter = gspread.utils.rowcol_to_a1(1, check + 1).rstrip('0123456789')
+            ranges.append(f"{check_letter}2:{check_letter}{max(last_row, 2)}")
+
+        header_values, *blocks = worksheet.batch_get(ranges)
+        tail_blocks = blocks[:len(spans)]
+        sample_blocks = blocks[len(spans):len(spans) + len(sample_rows) * len(spans)]
+
+        headers = header_values[0] if header_values else []
+        if not headers or row_hash(headers, len(headers)) != state['header_hash']:
+            logger.info("Cabeçalho alterado - recarga completa")
+            return None
+
+        tail = blocks_to_matrix(tail_blocks, widths)
+        tail_width = sum(widths)
+        if not len(tail) or row_hash(list(tail[0]), tail_width) != state['tail_hash']:
+            logger.info("Linhas anteriores alteradas - recarga completa")
+            return None
+
+        # Amostra das linhas anteriores: edições no meio da planilha
+        samples = self._split_rows(sample_blocks, len(sample_rows), widths)
+        if sample_rows and rows_hash(samples, tail_width) != state['sample_hash']:
+            logger.info("Linhas anteriores editadas - recarga completa")
+            return None
+
+        new_rows = tail[1:]
+        if not len(new_rows) and changed:
+            logger.info("Planilha alterada sem linhas novas - recarga completa")
+            return None
+
+        # Revisão mudou com linhas novas: a coluna conferida cobre as edições fora da amostra
+        check_cells = None
+        if changed:
+            check_cells = [row[0] if row else '' for row in blocks[-1]][:last_row - 1]
+            check_cells += [''] * (last_row - 1 - len(check_cells))
+            if column_hash(check_cells) != state['check_hash']:
+                logger.info("Linhas anteriores editadas na mesma revisão - recarga completa")
+                return None
+        if not len(new_rows):
+            logger.info(f"Leitura incremental: nenhuma linha nova em {self.describe()}")
+            return Snapshot(previous.df, revision=previous.revision, meta=state)
+
+        selected = [headers[i] for i in projection['indices']] if projection else headers
+        appended = apply_schema(matrix_to_dataframe(selected, new_rows))
+        if previous.df.empty:
+            df = appended
+        elif appended.empty:
+            df = previous.df
+        else:
+            # Categorias diferentes viram texto no concat: aplicar o esquema de novo
+            df = apply_schema(pd.concat([previous.df, appended], ignore_index=True))
+
+        meta = dict(state)
+        meta['row_count'] = last_row + len(new_rows)
+        meta['tail_hash'] = row_hash(list(new_rows[-1]), tail_width)
+        if check_cells is not None:
+            position = projection['indices'].index(check) if projection else check
+            meta['check_hash'] = column_hash(check_cells + new_rows[:, position].tolist())
+        else:
+            # Sem a coluna relida o hash não cobre as linhas novas
+            meta['check_hash'] = None
+
+        logger.info(f"Leitura incremental: {len(new_rows)} linhas novas em {self.describe()}")
+        return Snapshot(df, revision=self._state_revision(meta), meta=meta)
+
+class FileDataSource(DataSource):
+    """Base para fontes em arquivo local"""
+
+    def __init__(self, location: str, columns: List[str] = None):
+        """
+        Args:
+            location: Caminho do arquivo
+            columns: Colunas a ler (None = todas)
+        """
+        super().__init__(self._resolve_path(location))
+        self.columns = list(columns) if columns else None
+
+    @staticmethod
+    def _resolve_path(location: str) -> str:
+        """Caminhos relativos são resolvidos a partir de DATA_CONFIG['local_data_dir']"""
+        if os.path.isabs(location):
+            return location
+        return os.path.join(DATA_CONFIG['local_data_dir'], location)
+
+    def get_revision(self) -> str:
+        """Revisão do arquivo: data de modificação e tamanho"""
+        try:
+            stat = os.stat(self.location)
+        except OSError:
+            return ''
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def load(self) -> pd.DataFrame:
+        if not os.path.exists(self.location):
+            raise DataSourceError(f"Arquivo de dados não encontrado: {self.location}")
+
+        df = self._read()
+        if self.columns:
+            df = df[[col for col in df.columns if col in self.columns]]
+
+        # Mesma regra da planilha: descartar linhas totalmente vazias
+        filled = (df.notna() & df.ne('')).any(axis=1)
+        return df[filled].reset_index(drop=True)
+
+    def _read(self) -> pd.DataFrame:
+        raise NotImplementedError
+
+class CSVSource(FileDataSource):
+    """Arquivo CSV local (lido como texto, igual à planilha)"""
+
+    source_type = 'csv'
+
+    def _read(self) -> pd.DataFrame:
+        usecols = (lambda col: col in self.columns) if self.columns else None
+        return pd.read_csv(self.location, dtype=str, keep_default_na=False, usecols=usecols)
+
+class ParquetSource(FileDataSource):
+    """Arquivo Parquet local (requer pyarrow)"""
+
+    source_type = 'parquet'
+
+    def _read(self) -> pd.DataFrame:
+        if not self.columns:
+            return pd.read_parquet(self.location)
+
+        # Formato colunar: ler do disco apenas as colunas existentes no arquivo
+        import pyarrow.parquet as pq
+        names = pq.read_schema(self.location).names
+        return pd.read_parquet(self.location, columns=[col for col in names if col in self.columns])
+
+class JSONLinesSource(FileDataSource):
+    """Arquivo JSON-lines local (um objeto por linha)"""
+
+    source_type = 'jsonl'
+
+    def _read(self) -> pd.DataFrame:
+        return pd.read_json(self.location, lines=True, dtype=False)
+
+def run_parallel(tasks: List, max_workers: int) -> List:
+    """
+    Executa as funções em um pool limitado de threads e retorna os resultados na ordem
+
+    O contexto de cada chamador (ex: cliente e prioridade do agendador de cota)
+    é copiado para a thread que executa a função.
+
+    Args:
+        tasks: Funções sem argumentos
+        max_workers: Máximo de execuções simultâneas
+
+    Returns:
+        Resultados na ordem das funções (a primeira exceção é propagada)
+    """
+    if len(tasks) <= 1 or max_workers <= 1:
+        return [task() for task in tasks]
+
+    with ThreadPoolExecutor(max_workers=min(len(tasks), max_workers), thread_name_prefix='fetch') as executor:
+        futures = [executor.submit(contextvars.copy_context().run, task) for task in tasks]
+        return [future.result() for future in futures]
+
+class MultiSource(DataSource):
+    """
+    Várias fontes do mesmo cliente lidas em paralelo e unidas em um único DataFrame
+
+    As colunas são a união das colunas das partes (ausentes ficam vazias) e o
+    esquema é aplicado de novo após a união. O snapshot guarda, por parte, a
+    faixa de linhas e o estado da leitura, para que cada parte use revisão e
+    leitura incremental como se fosse lida sozinha.
+    """
+
+    source_type = 'multi'
+
+    def __init__(self, parts: List[DataSource], location: str = ''):
+        """
+        Args:
+            parts: Fontes que compõem os dados do cliente
+            location: Descrição das localizações (para logs)
+        """
+        super().__init__(location or ','.join(part.location for part in parts))
+        self.parts = parts
+
+    def get_parts(self) -> List[DataSource]:
+        """Partes a ler nesta coleta"""
+        return self.parts
+
+    def load(self) -> pd.DataFrame:
+        return self.fetch().df
+
+    def fetch(self, previous: Optional[Snapshot] = None) -> Snapshot:
+        parts = self.get_parts()
+        if not parts:
+            raise DataSourceError(f"Nenhuma fonte de dados encontrada em {self.location}")
+
+        previous_parts = self._split_previous(previous)
+        tasks = [
+            (lambda part=part: part.fetch(previous_parts.get(part.describe())))
+            for part in parts
+        ]
+        snapshots = run_parallel(tasks, DATA_CONFIG['max_parallel_fetches'])
+
+        unchanged = previous is not None and len(snapshots) == len(previous_parts) and all(
+            part.describe() in previous_parts and snapshot.df is previous_parts[part.describe()].df
+            for part, snapshot in zip(parts, snapshots)
+        )
+
+        if unchanged:
+            df = previous.df
+        else:
+            frames = [snapshot.df for snapshot in snapshots if not snapshot.df.empty]
+            df = apply_schema(pd.concat(frames, ignore_index=True, sort=False)) if frames else pd.DataFrame()
+
+        meta = {'source': self.describe(), 'parts': []}
+        offset = 0
+        for part, snapshot in zip(parts, snapshots):
+            rows = len(snapshot.df)
+            meta['parts'].append({
+                'source': part.describe(),
+                'offset': offset,
+                'rows': rows,
+                'columns': [str(col) for col in snapshot.df.columns],
+                'fetched_at': snapshot.fetched_at,
+                'revision': snapshot.revision,
+                'meta': snapshot.meta
+            })
+            offset += rows
+
+        revision = hashlib.md5('|'.join(snapshot.revision for snapshot in snapshots).encode('utf-8')).hexdigest()
+        if not unchanged:
+            logger.info(f"{len(parts)} fontes unidas em {self.describe()}: {len(df)} registros")
+        return Snapshot(df, revision=revision, meta=meta)
+
+    @staticmethod
+    def _split_previous(previous: Optional[Snapshot]) -> Dict[str, Snapshot]:
+        """Reconstrói o snapshot anterior de cada parte a partir da faixa de linhas"""
+        if previous is None:
+            return {}
+
+        part_snapshots = {}
+        for part in previous.meta.get('parts', []):
+            offset, rows = part['offset'], part['rows']
+            columns = [col for col in part['columns'] if col in previous.df.columns]
+            if rows and offset + rows > len(previous.df):
+                continue
+
+            df = previous.df.iloc[offset:offset + rows][columns].reset_index(drop=True) if rows else pd.DataFrame()
+            part_snapshots[part['source']] = Snapshot(
+                df,
+                fetched_at=part['fetched_at'],
+                revision=part['revision'],
+                meta=part['meta']
+            )
+
+        return part_snapshots
+
+class GoogleSheetsMultiSource(MultiSource):
+    """Várias abas e/ou várias planilhas Google Sheets de um mesmo cliente"""
+
+    source_type = 'sheets'
+
+    def __init__(self, locations: List[str], worksheets: List[str] = None, client=None, columns: List[str] = None):
+        """
+        Args:
+            locations: IDs das planilhas
+            worksheets: Títulos das abas (aceita curingas); vazio = aba padrão de cada planilha
+            client: Cliente gspread autorizado
+            columns: Colunas a ler (None = todas)
+        """
+        super().__init__([], location=','.join(locations))
+        self.locations = locations
+        self.worksheets = worksheets or []
+        self.client = client
+        self.columns = columns
+
+    def describe(self) -> str:
+        if self.worksheets:
+            return f"{self.source_type}:{self.location}/{','.join(self.worksheets)}"
+        return super().describe()
+
+    def fetch(self, previous: Optional[Snapshot] = None) -> Snapshot:
+        if not self.client:
+            return Snapshot(pd.DataFrame())
+        return super().fetch(previous)
+
+    def get_parts(self) -> List[DataSource]:
+        """
+        Monta uma parte por aba de cada planilha
+
+        Por planilha, em paralelo: uma consulta de revisão no Drive (reaproveitada
+        por todas as abas dela) e, se houver curingas, a lista de abas atual.
+        """
+        tasks = [(lambda location=location: self._spreadsheet_parts(location)) for location in self.locations]
+        results = run_parallel(tasks, DATA_CONFIG['max_parallel_fetches'])
+        return [part for parts in results for part in parts]
+
+    def _spreadsheet_parts(self, location: str) -> List[DataSource]:
+        if self.worksheets and any(char in spec for spec in self.worksheets for char in '*?['):
+            titles = [ws.title for ws in worksheet_resolver.list_worksheets(self.client, location)]
+            selected = match_worksheet_titles(titles, self.worksheets)
+        else:
+            selected = self.worksheets or [None]
+
+        parts = [
+            GoogleSheetsSource(location, client=self.client, worksheet=title, columns=self.columns)
+            for title in selected
+        ]
+        if parts and DATA_CONFIG['check_revision']:
+            drive_revision = parts[0].get_drive_revision()
+            for part in parts:
+                part.drive_revision = drive_revision
+
+        return parts
+
+# Registro de backends disponíveis
+DATA_SOURCES = {
+    GoogleSheetsSource.source_type: GoogleSheetsSource,
+    CSVSource.source_type: CSVSource,
+    ParquetSource.source_type: ParquetSource,
+    JSONLinesSource.source_type: JSONLinesSource
+}
+
+def create_data_source(source_type: Optional[str], location: str, client=None, worksheets=None,
+                       columns: List[str] = None) -> DataSource:
+    """
+    Cria a fonte de dados configurada para o cliente
+
+    Args:
+        source_type: 'sheets', 'csv', 'parquet' ou 'jsonl' (vazio = 'sheets')
+        location: ID da planilha ou caminho do arquivo (vários separados por vírgula)
+        client: Cliente gspread (usado apenas pelo backend Google Sheets)
+        worksheets: Abas a ler em cada planilha (aceita curingas, ex: 'Conversas *')
+        columns: Colunas a ler (None = todas)
+
+    Returns:
+        Instância de DataSource (MultiSource quando há mais de uma parte)
+    """
+    source_type = (source_type or GoogleSheetsSource.source_type).strip().lower()
+
+    if source_type not in DATA_SOURCES:
+        raise DataSourceError(f"Tipo de fonte de dados desconhecido: {source_type}")
+
+    locations = split_list(location)
+    worksheets = split_list(worksheets)
+
+    if source_type == GoogleSheetsSource.source_type:
+        if len(locations) == 1 and not worksheets:
+            return GoogleSheetsSource(locations[0], client=client, columns=columns)
+        return GoogleSheetsMultiSource(locations, worksheets, client=client, columns=columns)
+
+    if len(locations) == 1:
+        return DATA_SOURCES[source_type](locations[0], columns=columns)
+    return MultiSource([DATA_SOURCES[source_type](path, columns=columns) for path in locations])
@@ -0,0 +1,176 @@
+"""
+Armazenamento em Disco de Snapshots
+Persiste o DataFrame de cada cliente em formato colunar (Parquet ou Arrow IPC) com um manifesto
+"""
+
+import streamlit as st
+import pandas as pd
+import json
+import os
+import re
+import logging
+from typing import Optional
+
+from config.settings import DATA_CONFIG
+from src.data.schema import apply_schema
+from src.data.snapshots import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Extensão de arquivo por formato suportado
+SNAPSHOT_FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow'
+}
+
+class SnapshotStore:
+    """Snapshots colunares em disco, um arquivo de dados + manifesto por cliente"""
+
+    def __init__(self, base_dir: str, fmt: str = 'parquet'):
+        """
+        Args:
+            base_dir: Diretório dos snapshots
+            fmt: 'parquet' ou 'arrow' (Arrow IPC / Feather v2)
+        """
+        if fmt not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Formato de snapshot inválido: {fmt}")
+
+        self.base_dir = base_dir
+        self.fmt = fmt
+        self.enabled = self._check_engine()
+
+        if self.enabled:
+            os.makedirs(base_dir, exist_ok=True)
+
+    @staticmethod
+    def _check_engine() -> bool:
+        """Parquet e Arrow IPC dependem do pyarrow"""
+        try:
+            import pyarrow  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("pyarrow não instalado - snapshots em disco desativados")
+            return False
+
+    def _paths(self, key: str):
+        """Caminhos do arquivo de dados e do manifesto de uma chave"""
+        safe_key = re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+        data_path = os.path.join(self.base_dir, safe_key + SNAPSHOT_FORMATS[self.fmt])
+        manifest_path = os.path.join(self.base_dir, safe_key + '.manifest.json')
+        return data_path, manifest_path
+
+    def save(self, key: str, snapshot: Snapshot) -> bool:
+        """
+        Grava o snapshot em disco (escrita atômica)
+
+        Returns:
+            True se gravou com sucesso
+        """
+        if not self.enabled or snapshot.df.empty:
+            return False
+
+        data_path = self._paths(key)[0]
+
+        try:
+            tmp_data_path = data_path + '.tmp'
+            if self.fmt == 'parquet':
+                snapshot.df.to_parquet(tmp_data_path, index=False)
+            else:
+                snapshot.df.to_feather(tmp_data_path)
+            os.replace(tmp_data_path, data_path)
+
+            self._write_manifest(key, snapshot)
+
+            logger.info(f"Snapshot gravado em disco: {data_path} ({len(snapshot.df)} registros)")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Erro ao gravar snapshot de {key}: {e}")
+            return False
+
+    def touch(self, key: str, snapshot: Snapshot) -> bool:
+        """
+        Atualiza apenas o manifesto (dados inalterados, nova data de coleta)
+
+        Returns:
+            True se gravou com sucesso
+        """
+        if not self.enabled or not os.path.exists(self._paths(key)[0]):
+            return False
+
+        try:
+            self._write_manifest(key, snapshot)
+            return True
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar manifesto de {key}: {e}")
+            return False
+
+    def _write_manifest(self, key: str, snapshot: Snapshot):
+        """Grava o manifesto do snapshot (escrita atômica)"""
+        manifest_path = self._paths(key)[1]
+        manifest = {
+            'key': key,
+            'format': self.fmt,
+            'fetched_at': snapshot.fetched_at,
+            'revision': snapshot.revision,
+            'rows': len(snapshot.df),
+            'columns': len(snapshot.df.columns),
+            'meta': snapshot.meta
+        }
+
+        tmp_manifest_path = manifest_path + '.tmp'
+        with open(tmp_manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest_path, manifest_path)
+
+    def load(self, key: str) -> Optional[Snapshot]:
+        """
+        Lê o snapshot gravado em disco
+
+        Returns:
+            Snapshot ou None se não existir / estiver corrompido
+        """
+        if not self.enabled:
+            return None
+
+        data_path, manifest_path = self._paths(key)
+        if not os.path.exists(data_path) or not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            if manifest.get('format') != self.fmt:
+                return None
+
+            if self.fmt == 'parquet':
+                df = pd.read_parquet(data_path)
+            else:
+                df = pd.read_feather(data_path)
+
+            # Snapshots gravados antes do esquema tipado vêm como texto
+            df = apply_schema(df)
+
+            logger.info(f"Snapshot lido do disco: {data_path} ({len(df)} registros)")
+            return Snapshot(
+                df,
+                fetched_at=manifest['fetched_at'],
+                revision=manifest.get('revision', ''),
+                meta=manifest.get('meta', {})
+            )
+
+        except Exception as e:
+            logger.warning(f"Erro ao ler snapshot de {key}: {e}")
+            return None
+
+    def delete(self, key: str):
+        """Remove snapshot e manifesto de uma chave"""
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    """Instância única do armazenamento em disco"""
+    return SnapshotStore(DATA_CONFIG['snapshot_dir'], DATA_CONFIG['snapshot_format'])
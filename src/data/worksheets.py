@@ -0,0 +1,159 @@
+"""
+Resolução da Aba de Dados
+Escolhe a aba de conversas com uma única leitura de metadados e guarda o resultado por planilha
+"""
+
+import threading
+import logging
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Abas procuradas na planilha do cliente, em ordem de preferência
+WORKSHEET_NAMES = ['Contatos', 'Contacts', 'Conversas', 'Conversations', 'Sheet1']
+
+def pick_worksheet(worksheets: List, preferred: List[str] = None):
+    """
+    Escolhe a melhor aba entre as existentes
+
+    Para cada título, na ordem de preferência, aceita o nome exato ou o
+    mesmo nome ignorando maiúsculas/minúsculas e espaços nas bordas.
+
+    Args:
+        worksheets: Abas da planilha (objetos com atributo title)
+        preferred: Títulos em ordem de preferência
+
+    Returns:
+        Aba escolhida ou None
+    """
+    preferred = preferred or WORKSHEET_NAMES
+    by_title = {ws.title: ws for ws in worksheets}
+
+    by_normalized = {}
+    for ws in worksheets:
+        by_normalized.setdefault(ws.title.strip().lower(), ws)
+
+    for name in preferred:
+        if name in by_title:
+            return by_title[name]
+
+        ws = by_normalized.get(name.strip().lower())
+        if ws is not None:
+            return ws
+
+    return None
+
+def match_worksheet_titles(titles: List[str], specs: List[str]) -> List[str]:
+    """
+    Expande a lista de abas configurada (aceita curingas, ex: 'Conversas *')
+
+    Args:
+        titles: Títulos existentes na planilha, na ordem das abas
+        specs: Títulos ou padrões configurados
+
+    Returns:
+        Títulos selecionados, sem repetição, na ordem da configuração
+    """
+    selected = []
+    for spec in specs:
+        if any(char in spec for char in '*?['):
+            matches = [title for title in titles if fnmatchcase(title.strip().lower(), spec.strip().lower())]
+        else:
+            matches = [spec]
+
+        for title in matches:
+            if title not in selected:
+                selected.append(title)
+
+    return selected
+
+class WorksheetResolver:
+    """Cache de abas resolvidas por ID de planilha (e lista de títulos preferidos)"""
+
+    def __init__(self):
+        self._resolved: Dict[Tuple[str, Tuple[str, ...]], Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(spreadsheet_id: str, preferred: List[str] = None):
+        return spreadsheet_id, tuple(preferred or WORKSHEET_NAMES)
+
+    def _store(self, spreadsheet_id: str, preferred: List[str], worksheet, revision: str = None):
+        with self._lock:
+            self._resolved[self._key(spreadsheet_id, preferred)] = {
+                'id': worksheet.id,
+                'title': worksheet.title,
+                'worksheet': worksheet,
+                'revision': revision  # Revisão da planilha quando os metadados foram lidos
+            }
+
+    def resolve(self, client, spreadsheet_id: str, preferred: List[str] = None, revision: str = None):
+        """
+        Retorna a aba de dados da planilha
+
+        Na primeira vez abre a planilha e lista as abas (metadados em uma
+        chamada). Depois disso a aba guardada é usada diretamente, até a
+        revisão informada mudar: aí os metadados (ex: row_count) são lidos de novo.
+
+        Args:
+            client: Cliente gspread
+            spreadsheet_id: ID da planilha
+            preferred: Títulos em ordem de preferência
+            revision: Revisão atual da planilha (None = não conferir)
+
+        Returns:
+            Worksheet ou None se nenhuma aba conhecida existir
+        """
+        key = self._key(spreadsheet_id, preferred)
+        with self._lock:
+            entry = self._resolved.get(key)
+            if entry is not None and revision and entry['revision'] is None:
+                # Aba guardada sem revisão (ex: list_worksheets): vale para a atual
+                entry['revision'] = revision
+        if entry is not None and (not revision or entry['revision'] == revision):
+            return entry['worksheet']
+
+        sheet = client.open_by_key(spreadsheet_id)
+        worksheet = pick_worksheet(sheet.worksheets(), preferred)
+
+        if worksheet is None:
+            return None
+
+        if entry is None:
+            logger.info(f"Aba '{worksheet.title}' (id {worksheet.id}) resolvida para {spreadsheet_id}")
+        self._store(spreadsheet_id, preferred, worksheet, revision)
+        return worksheet
+
+    def list_worksheets(self, client, spreadsheet_id: str) -> List:
+        """
+        Lista as abas da planilha (uma leitura de metadados, sem cache)
+
+        Cada aba listada fica guardada para resolve(..., preferred=[título]),
+        então a leitura das abas escolhidas não consulta os metadados de novo.
+
+        Returns:
+            Abas na ordem da planilha
+        """
+        worksheets = client.open_by_key(spreadsheet_id).worksheets()
+        for worksheet in worksheets:
+            self._store(spreadsheet_id, [worksheet.title], worksheet)
+        return worksheets
+
+    def get_resolved_id(self, spreadsheet_id: str, preferred: List[str] = None) -> Optional[int]:
+        """ID da aba já resolvida para a planilha (None se ainda não resolvida)"""
+        with self._lock:
+            entry = self._resolved.get(self._key(spreadsheet_id, preferred))
+        return entry['id'] if entry else None
+
+    def invalidate(self, spreadsheet_id: str = None):
+        """Esquece as abas resolvidas da planilha (ex: aba renomeada ou removida)"""
+        with self._lock:
+            if spreadsheet_id:
+                for key in [key for key in self._resolved if key[0] == spreadsheet_id]:
+                    del self._resolved[key]
+            else:
+                self._resolved.clear()
+
+# Instância global (compartilhada por todas as sessões do processo)
+worksheet_resolver = WorksheetResolver()
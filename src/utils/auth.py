@@ -4,18 +4,17 @@ Gerencia login e acesso às planilhas específicas de cada cliente
 """
 
 import streamlit as st
-import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 from datetime import datetime
 import hashlib
 import hmac
 
+from config.settings import GOOGLE_API_CONFIG
+from src.utils.google_client import get_client_pool
+from src.utils.quota import quota_context
+
 # Configurações
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
-]
+SCOPES = GOOGLE_API_CONFIG['scopes']
 
 class AuthManager:
     """Gerenciador de autenticação multi-cliente"""
@@ -28,12 +27,13 @@ class AuthManager:
         self._init_google_auth()
     
     def _init_google_auth(self):
-        """Inicializa autenticação com Google Sheets"""
+        """Obtém credenciais e cliente do pool compartilhado do processo"""
         try:
-            if 'GOOGLE_CREDENTIALS' in st.secrets:
-                creds_dict = dict(st.secrets['GOOGLE_CREDENTIALS'])
-                self.creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-                self.client = gspread.authorize(self.creds)
+            pool = get_client_pool()
+            
+            if pool:
+                self.creds = pool.credentials
+                self.client = pool.get_client()
             else:
                 st.error("❌ Credenciais do Google não configuradas")
         except Exception as e:
@@ -49,12 +49,13 @@ class AuthManager:
             if not self.client:
                 return pd.DataFrame()
             
-            # Abrir planilha mestre
-            sheet = self.client.open_by_key(self.master_sheet_id)
-            worksheet = sheet.get_worksheet(0)  # Primeira aba
-            
-            # Carregar dados
-            data = worksheet.get_all_values()
+            with quota_context(self.master_sheet_id):
+                # Abrir planilha mestre
+                sheet = self.client.open_by_key(self.master_sheet_id)
+                worksheet = sheet.get_worksheet(0)  # Primeira aba
+                
+                # Carregar dados
+                data = worksheet.get_all_values()
             if len(data) < 2:
                 return pd.DataFrame()
             
@@ -121,6 +122,10 @@ class AuthManager:
                 'client_id': client_row['client_id'],
                 'client_name': client_row['client_name'],
                 'planilha_id': client_row['planilha_id'],
+                'fonte_dados': client_row.get('fonte_dados', '') or 'sheets',
+                'caminho_dados': client_row.get('caminho_dados', ''),
+                'abas_dados': client_row.get('abas_dados', ''),
+                'regras_score': client_row.get('regras_score', ''),
                 'created_at': client_row.get('created_at', ''),
                 'authenticated_at': datetime.now().isoformat()
             }
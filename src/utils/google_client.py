@@ -0,0 +1,109 @@
+"""
+Pool de Clientes da API Google
+Reaproveita credenciais e sessões HTTP (keep-alive) entre reruns e sessões do Streamlit
+"""
+
+import streamlit as st
+import gspread
+from gspread.http_client import HTTPClient
+from google.oauth2.service_account import Credentials
+from google.auth.transport.requests import Request
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta
+import threading
+import logging
+from typing import Optional
+
+from config.settings import GOOGLE_API_CONFIG
+from src.utils.quota import get_quota_scheduler
+from src.utils.sheets_emulator import create_emulated_client, EmulatedClientPool
+
+logger = logging.getLogger(__name__)
+
+class QuotaHTTPClient(HTTPClient):
+    """Cliente HTTP do gspread que passa toda requisição pelo agendador de cota"""
+
+    def request(self, *args, **kwargs):
+        return get_quota_scheduler().call(super().request, *args, **kwargs)
+
+class GoogleClientPool:
+    """Pool de clientes gspread que compartilham uma única credencial"""
+
+    def __init__(self, credentials: Credentials, size: int = 4):
+        """
+        Args:
+            credentials: Credenciais da service account
+            size: Número de clientes (sessões HTTP) mantidos abertos
+        """
+        self.credentials = credentials
+        self.size = max(1, size)
+        self._clients = []
+        self._next_index = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def _new_client(self) -> gspread.Client:
+        """Cria cliente com sessão HTTP própria e pool de conexões persistentes"""
+        client = gspread.authorize(self.credentials, http_client=QuotaHTTPClient)
+
+        adapter = HTTPAdapter(
+            pool_connections=GOOGLE_API_CONFIG['http_pool_maxsize'],
+            pool_maxsize=GOOGLE_API_CONFIG['http_pool_maxsize']
+        )
+        client.http_client.session.mount('https://', adapter)
+        return client
+
+    def _ensure_token(self):
+        """Renova o token antes de expirar, uma única vez para todo o pool"""
+        margin = timedelta(seconds=GOOGLE_API_CONFIG['token_refresh_margin'])
+
+        with self._refresh_lock:
+            expiry = self.credentials.expiry
+            if self.credentials.valid and expiry and expiry - margin > datetime.utcnow():
+                return
+
+            self.credentials.refresh(Request())
+            logger.info("Token da API Google renovado")
+
+    def get_client(self) -> gspread.Client:
+        """
+        Retorna um cliente do pool (rodízio entre as sessões abertas)
+
+        Returns:
+            Cliente gspread autorizado
+        """
+        self._ensure_token()
+
+        with self._lock:
+            if len(self._clients) < self.size:
+                client = self._new_client()
+                self._clients.append(client)
+                return client
+
+            client = self._clients[self._next_index]
+            self._next_index = (self._next_index + 1) % self.size
+            return client
+
+@st.cache_resource
+def get_client_pool() -> Optional[GoogleClientPool]:
+    """
+    Pool único do processo, criado a partir de st.secrets['GOOGLE_CREDENTIALS']
+
+    Com SHEETS_EMULATOR_DIR definido, o pool serve o emulador local.
+
+    Returns:
+        GoogleClientPool (ou EmulatedClientPool) ou None se as credenciais não estiverem configuradas
+    """
+    # Emulador local configurado: fixtures em disco no lugar da API
+    emulated_client = create_emulated_client()
+    if emulated_client:
+        return EmulatedClientPool(emulated_client)
+
+    if 'GOOGLE_CREDENTIALS' not in st.secrets:
+        return None
+
+    creds_dict = dict(st.secrets['GOOGLE_CREDENTIALS'])
+    credentials = Credentials.from_service_account_info(creds_dict, scopes=GOOGLE_API_CONFIG['scopes'])
+
+    logger.info("Pool de clientes Google Sheets inicializado")
+    return GoogleClientPool(credentials, size=GOOGLE_API_CONFIG['client_pool_size'])
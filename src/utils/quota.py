@@ -0,0 +1,247 @@
+"""
+Agendador de Cota da API Google
+Limita a taxa de requisições (token bucket), repete erros temporários com backoff exponencial
+e distribui a vez entre clientes, com prioridade para cargas interativas
+"""
+
+import random
+import threading
+import time
+import logging
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from config.settings import GOOGLE_API_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Filas de prioridade (interativa sempre antes de segundo plano)
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+# Fração de ficha desprezada na conta do token bucket (erro de ponto flutuante)
+TOKEN_EPSILON = 1e-9
+
+# Cliente e prioridade das requisições feitas no contexto atual (thread/tarefa)
+_quota_context: ContextVar = ContextVar('quota_context', default=('', INTERACTIVE))
+
+@contextmanager
+def quota_context(tenant: str, priority: str = INTERACTIVE):
+    """
+    Define o cliente e a prioridade das requisições feitas dentro do bloco
+
+    Args:
+        tenant: Identificador do cliente (ex: ID da planilha)
+        priority: INTERACTIVE ou BACKGROUND
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Prioridade inválida: {priority}")
+
+    token = _quota_context.set((tenant, priority))
+    try:
+        yield
+    finally:
+        _quota_context.reset(token)
+
+def get_quota_context():
+    """Cliente e prioridade do contexto atual"""
+    return _quota_context.get()
+
+def get_status_code(error: Exception) -> Optional[int]:
+    """Status HTTP de um erro da API (gspread.APIError / requests.HTTPError)"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+class TokenBucket:
+    """Token bucket: `rate` fichas por segundo, acumulando até `capacity`"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Fichas repostas por segundo
+            capacity: Máximo de fichas acumuladas (rajada)
+            clock: Relógio monotônico (injetável em testes)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> float:
+        """
+        Consome uma ficha se houver
+
+        Returns:
+            0 se consumiu, senão segundos até a próxima ficha
+        """
+        self._refill()
+        # Tolerância de arredondamento: sem ela, sobra uma espera menor que a
+        # resolução do relógio (ex: 4e-16 s) que não o faz avançar
+        if self.tokens >= 1 - TOKEN_EPSILON:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def drain(self, seconds: float = 0.0):
+        """Esvazia o balde (e adia a reposição) após a API sinalizar limite excedido"""
+        self._refill()
+        self.tokens = -seconds * self.rate
+
+class QuotaScheduler:
+    """
+    Porta única para as requisições à API
+
+    Cada chamada espera sua vez: filas por prioridade, rodízio entre clientes
+    dentro de cada fila, e uma ficha do token bucket por requisição. Erros
+    429/5xx são repetidos com backoff exponencial e jitter.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 32.0, retry_statuses=(429, 500, 502, 503, 504),
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        """
+        Args:
+            requests_per_minute: Taxa média permitida pela cota
+            burst: Requisições permitidas em rajada
+            max_retries: Tentativas extras para erros temporários
+            backoff_base: Espera inicial do backoff (segundos)
+            backoff_max: Espera máxima do backoff (segundos)
+            retry_statuses: Status HTTP considerados temporários
+            clock: Relógio monotônico (injetável em testes)
+            sleep: Função de espera do backoff (injetável em testes)
+            rng: Gerador do jitter (injetável em testes)
+        """
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst, clock=clock)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = set(retry_statuses)
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+        # Fila de cada prioridade: cliente -> tickets aguardando (ordem = rodízio)
+        self._lanes = {priority: OrderedDict() for priority in PRIORITIES}
+        self._cond = threading.Condition()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0}
+
+    def call(self, fn: Callable[..., Any], *args, tenant: Optional[str] = None,
+             priority: Optional[str] = None, **kwargs) -> Any:
+        """
+        Executa uma requisição respeitando a cota
+
+        Args:
+            fn: Função que faz a requisição
+            tenant: Cliente (padrão: o do quota_context atual)
+            priority: INTERACTIVE ou BACKGROUND (padrão: a do quota_context atual)
+
+        Returns:
+            Resultado de fn
+        """
+        context_tenant, context_priority = get_quota_context()
+        tenant = context_tenant if tenant is None else tenant
+        priority = priority or context_priority
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(tenant, priority)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                status = get_status_code(e)
+                if status not in self.retry_statuses or attempt == self.max_retries:
+                    raise
+
+                delay = self._backoff(attempt)
+                with self._cond:
+                    self.stats['retries'] += 1
+                    if status == 429:
+                        # Cota estourada: todos os clientes esperam, não só este
+                        self.stats['throttled'] += 1
+                        self.bucket.drain(delay)
+
+                logger.warning(
+                    f"API retornou {status} para {tenant or 'sem cliente'} - "
+                    f"nova tentativa em {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+                )
+                self.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera exponencial com jitter (metade fixa + metade aleatória)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + self.rng.random() * delay / 2
+
+    def _next_ticket(self):
+        """Próximo ticket a ser atendido: primeira fila não vazia, cliente da vez"""
+        for priority in PRIORITIES:
+            lane = self._lanes[priority]
+            if lane:
+                tickets = next(iter(lane.values()))
+                return tickets[0]
+        return None
+
+    def _acquire(self, tenant: str, priority: str):
+        """Aguarda a vez do ticket e uma ficha do token bucket"""
+        ticket = object()
+        lane = self._lanes[priority]
+
+        with self._cond:
+            lane.setdefault(tenant, deque()).append(ticket)
+
+            while True:
+                if self._next_ticket() is ticket:
+                    wait = self.bucket.try_acquire()
+                    if wait == 0:
+                        break
+                    # Espera fora do lock (sleep injetável permite testar com relógio falso)
+                    self._cond.release()
+                    try:
+                        self.sleep(wait)
+                    finally:
+                        self._cond.acquire()
+                else:
+                    self._cond.wait()
+
+            # Atendido: cliente vai para o fim da fila (rodízio)
+            tickets = lane[tenant]
+            tickets.popleft()
+            if tickets:
+                lane.move_to_end(tenant)
+            else:
+                del lane[tenant]
+
+            self.stats['requests'] += 1
+            self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+        """Contadores de requisições, novas tentativas e limites excedidos"""
+        with self._cond:
+            waiting = {priority: sum(len(t) for t in lane.values()) for priority, lane in self._lanes.items()}
+            return dict(self.stats, waiting=waiting)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_quota_scheduler() -> QuotaScheduler:
+    """Agendador único do processo (a cota da service account é compartilhada)"""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = QuotaScheduler(
+                requests_per_minute=GOOGLE_API_CONFIG['requests_per_minute'],
+                burst=GOOGLE_API_CONFIG['request_burst'],
+                max_retries=GOOGLE_API_CONFIG['max_retries'],
+                backoff_base=GOOGLE_API_CONFIG['backoff_base'],
+                backoff_max=GOOGLE_API_CONFIG['backoff_max'],
+                retry_statuses=GOOGLE_API_CONFIG['retry_statuses']
+            )
+        return _scheduler
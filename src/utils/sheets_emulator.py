@@ -0,0 +1,340 @@
+"""
+Emulador Local do Google Sheets
+Substitui o cliente gspread por fixtures em disco (benchmarks e testes de carga sem rede)
+"""
+
+import os
+import json
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import gspread
+import requests
+from gspread.utils import a1_range_to_grid_range, rowcol_to_a1
+
+from config.settings import GOOGLE_API_CONFIG
+from src.utils.quota import get_quota_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Tamanho padrão da grade de uma aba nova no Google Sheets
+DEFAULT_GRID_ROWS = 1000
+DEFAULT_GRID_COLS = 26
+
+def fixture_path(fixtures_dir: str, spreadsheet_id: str) -> str:
+    """Arquivo de fixture de uma planilha"""
+    return os.path.join(fixtures_dir, f"{spreadsheet_id}.json")
+
+def _now_rfc3339() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+def _api_error(status_code: int, message: str) -> gspread.exceptions.APIError:
+    """APIError igual à do gspread (com resposta HTTP e corpo de erro da API)"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(
+        {'error': {'code': status_code, 'message': message, 'status': 'EMULATED'}}
+    ).encode('utf-8')
+    return gspread.exceptions.APIError(response)
+
+def _trim(rows: List[List[str]]) -> List[List[str]]:
+    """Corta células vazias no fim de cada linha e linhas vazias no fim (como a API)"""
+    trimmed = []
+    for row in rows:
+        end = len(row)
+        while end and row[end - 1] == '':
+            end -= 1
+        trimmed.append(list(row[:end]))
+
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+class EmulatedWorksheet:
+    """Aba emulada (subconjunto da API de gspread.Worksheet usado pelo dashboard)"""
+
+    def __init__(self, spreadsheet: 'EmulatedSpreadsheet', title: str, sheet_id: int, values: List[List[str]],
+                 row_count: int = None, col_count: int = None):
+        self.spreadsheet = spreadsheet
+        self.client = spreadsheet.client
+        self.title = title
+        self.id = sheet_id
+        self._values = [[str(cell) for cell in row] for row in values]
+        width = max((len(row) for row in self._values), default=0)
+        self.row_count = max(row_count or DEFAULT_GRID_ROWS, len(self._values))
+        self.col_count = max(col_count or DEFAULT_GRID_COLS, width)
+
+    def __repr__(self):
+        return f"<EmulatedWorksheet '{self.title}' id:{self.id}>"
+
+    def _read(self, range_name: str) -> List[List[str]]:
+        grid = a1_range_to_grid_range(range_name)
+        row_start = grid.get('startRowIndex', 0)
+        row_end = grid.get('endRowIndex', len(self._values))
+        col_start = grid.get('startColumnIndex', 0)
+        col_end = grid.get('endColumnIndex', self.col_count)
+        return _trim([row[col_start:col_end] for row in self._values[row_start:row_end]])
+
+    def get_all_values(self) -> List[List[str]]:
+        """Todos os valores, com linhas completadas até a largura preenchida"""
+        def serve():
+            rows = _trim(self._values)
+            width = max((len(row) for row in rows), default=0)
+            return [row + [''] * (width - len(row)) for row in rows]
+        return self.client.request(serve)
+
+    def row_values(self, row: int) -> List[str]:
+        def serve():
+            rows = self._read(f"{row}:{row}")
+            return rows[0] if rows else []
+        return self.client.request(serve)
+
+    def get_values(self, range_name: str = None) -> List[List[str]]:
+        if range_name is None:
+            return self.get_all_values()
+        return self.client.request(self._read, range_name)
+
+    def batch_get(self, ranges: List[str], **kwargs) -> List[List[List[str]]]:
+        """Vários intervalos em uma única requisição"""
+        return self.client.request(lambda: [self._read(range_name) for range_name in ranges])
+
+    def update(self, values=None, range_name: str = None, **kwargs) -> Dict:
+        """
+        Grava valores a partir do canto superior esquerdo do intervalo
+
+        Aceita a ordem antiga dos argumentos (intervalo, valores), como o gspread.
+        """
+        if isinstance(values, str) and not isinstance(range_name, str):
+            values, range_name = range_name, values
+
+        def serve():
+            grid = a1_range_to_grid_range(range_name or 'A1')
+            row_start = grid.get('startRowIndex', 0)
+            col_start = grid.get('startColumnIndex', 0)
+
+            with self.spreadsheet.lock:
+                for offset, row_values in enumerate(values):
+                    row_index = row_start + offset
+                    while len(self._values) <= row_index:
+                        self._values.append([])
+                    row = self._values[row_index]
+                    end = col_start + len(row_values)
+                    if len(row) < end:
+                        row.extend([''] * (end - len(row)))
+                    row[col_start:end] = [str(cell) for cell in row_values]
+                    self.col_count = max(self.col_count, end)
+
+                self.row_count = max(self.row_count, len(self._values))
+                self.spreadsheet.touch()
+
+            n_rows = len(values)
+            n_cols = max((len(row) for row in values), default=0)
+            updated = f"{rowcol_to_a1(row_start + 1, col_start + 1)}:{rowcol_to_a1(row_start + n_rows, col_start + n_cols)}"
+            return {'updatedRange': f"'{self.title}'!{updated}", 'updatedRows': n_rows, 'updatedColumns': n_cols}
+
+        return self.client.request(serve)
+
+class EmulatedSpreadsheet:
+    """Planilha emulada carregada de uma fixture"""
+
+    def __init__(self, client: 'EmulatedClient', spreadsheet_id: str, fixture: Dict):
+        self.client = client
+        self.id = spreadsheet_id
+        self.title = fixture.get('title', spreadsheet_id)
+        self.modified_time = fixture.get('modifiedTime') or _now_rfc3339()
+        self.lock = threading.Lock()
+        self._worksheets = [
+            EmulatedWorksheet(
+                self, sheet['title'], sheet.get('id', index), sheet.get('values', []),
+                sheet.get('row_count'), sheet.get('col_count')
+            )
+            for index, sheet in enumerate(fixture.get('worksheets', []))
+        ]
+
+    @property
+    def url(self) -> str:
+        return f"https://docs.google.com/spreadsheets/d/{self.id}"
+
+    def touch(self):
+        """Marca a planilha como modificada (revisão do Drive muda)"""
+        self.modified_time = _now_rfc3339()
+
+    def worksheets(self) -> List[EmulatedWorksheet]:
+        return self.client.request(lambda: list(self._worksheets))
+
+    def worksheet(self, title: str) -> EmulatedWorksheet:
+        def serve():
+            for worksheet in self._worksheets:
+                if worksheet.title == title:
+                    return worksheet
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.client.request(serve)
+
+    def get_worksheet(self, index: int) -> Optional[EmulatedWorksheet]:
+        return self.client.request(lambda: self._worksheets[index] if 0 <= index < len(self._worksheets) else None)
+
+    def get_worksheet_by_id(self, sheet_id: int) -> EmulatedWorksheet:
+        def serve():
+            for worksheet in self._worksheets:
+                if worksheet.id == sheet_id:
+                    return worksheet
+            raise gspread.exceptions.WorksheetNotFound(f"id {sheet_id}")
+        return self.client.request(serve)
+
+class EmulatedClient:
+    """
+    Cliente que responde como o gspread a partir de fixtures em disco
+
+    Cada chamada conta como uma requisição: passa pelo agendador de cota (como
+    o QuotaHTTPClient) e recebe a latência e os erros configurados, então
+    benchmarks e testes de carga exercitam o mesmo caminho da API real.
+    Gravações ficam só em memória (a fixture em disco não é alterada).
+    """
+
+    def __init__(self, fixtures_dir: str, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_statuses: List[int] = None,
+                 use_quota: bool = True, seed: int = None):
+        """
+        Args:
+            fixtures_dir: Diretório com um arquivo <id da planilha>.json por planilha
+            latency: Atraso médio de cada requisição (segundos)
+            jitter: Variação da latência (fração, ex: 0.5 = ±50%)
+            error_rate: Probabilidade de uma requisição falhar
+            error_statuses: Códigos HTTP sorteados nas falhas
+            use_quota: Passar as requisições pelo agendador de cota
+            seed: Semente do sorteio de latência e erros (reprodutível)
+        """
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses or [429, 503])
+        self.use_quota = use_quota
+        self._random = random.Random(seed)
+        self._spreadsheets: Dict[str, EmulatedSpreadsheet] = {}
+        self._lock = threading.Lock()
+        self.request_count = 0
+
+    def request(self, serve, *args, **kwargs):
+        """Executa uma requisição emulada (cota, latência e erro injetado)"""
+        if self.use_quota:
+            return get_quota_scheduler().call(self._serve, serve, *args, **kwargs)
+        return self._serve(serve, *args, **kwargs)
+
+    def _serve(self, serve, *args, **kwargs):
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency * (1 + self.jitter * (2 * self._random.random() - 1))
+            failed = self._random.random() < self.error_rate
+            status = self._random.choice(self.error_statuses)
+
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise _api_error(status, "Erro injetado pelo emulador")
+        return serve(*args, **kwargs)
+
+    def _load(self, spreadsheet_id: str) -> EmulatedSpreadsheet:
+        with self._lock:
+            spreadsheet = self._spreadsheets.get(spreadsheet_id)
+            if spreadsheet is not None:
+                return spreadsheet
+
+            path = fixture_path(self.fixtures_dir, spreadsheet_id)
+            if not os.path.exists(path):
+                raise _api_error(404, f"Requested entity was not found: {spreadsheet_id}")
+
+            with open(path, encoding='utf-8') as f:
+                spreadsheet = EmulatedSpreadsheet(self, spreadsheet_id, json.load(f))
+            self._spreadsheets[spreadsheet_id] = spreadsheet
+            return spreadsheet
+
+    def open_by_key(self, key: str) -> EmulatedSpreadsheet:
+        return self.request(self._load, key)
+
+    def get_file_drive_metadata(self, id: str) -> Dict:
+        def serve():
+            spreadsheet = self._load(id)
+            return {'id': id, 'name': spreadsheet.title, 'modifiedTime': spreadsheet.modified_time}
+        return self.request(serve)
+
+class EmulatedClientPool:
+    """Pool com a mesma interface do GoogleClientPool, servindo um único cliente emulado"""
+
+    def __init__(self, client: EmulatedClient):
+        self.credentials = None
+        self.client = client
+
+    def get_client(self) -> EmulatedClient:
+        return self.client
+
+def create_emulated_client() -> Optional[EmulatedClient]:
+    """
+    Cliente emulado conforme GOOGLE_API_CONFIG (variável SHEETS_EMULATOR_DIR)
+
+    Returns:
+        EmulatedClient ou None se o emulador não estiver configurado
+    """
+    fixtures_dir = GOOGLE_API_CONFIG['emulator_dir']
+    if not fixtures_dir:
+        return None
+
+    logger.info(f"Usando emulador do Google Sheets com fixtures em {fixtures_dir}")
+    return EmulatedClient(
+        fixtures_dir,
+        latency=GOOGLE_API_CONFIG['emulator_latency'],
+        jitter=GOOGLE_API_CONFIG['emulator_jitter'],
+        error_rate=GOOGLE_API_CONFIG['emulator_error_rate']
+    )
+
+def record_spreadsheet(client, spreadsheet_id: str, fixtures_dir: str) -> str:
+    """
+    Grava uma planilha real como fixture do emulador
+
+    Salva título, data de modificação no Drive e, para cada aba, título, id,
+    tamanho da grade e todos os valores.
+
+    Args:
+        client: Cliente gspread autorizado (real)
+        spreadsheet_id: ID da planilha
+        fixtures_dir: Diretório das fixtures
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    spreadsheet = client.open_by_key(spreadsheet_id)
+
+    try:
+        modified_time = client.get_file_drive_metadata(spreadsheet_id).get('modifiedTime')
+    except Exception as e:
+        logger.warning(f"Metadados do Drive indisponíveis para {spreadsheet_id}: {e}")
+        modified_time = None
+
+    fixture = {
+        'title': spreadsheet.title,
+        'modifiedTime': modified_time,
+        'worksheets': [
+            {
+                'title': worksheet.title,
+                'id': worksheet.id,
+                'row_count': worksheet.row_count,
+                'col_count': worksheet.col_count,
+                'values': worksheet.get_all_values()
+            }
+            for worksheet in spreadsheet.worksheets()
+        ]
+    }
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    path = fixture_path(fixtures_dir, spreadsheet_id)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(fixture, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Planilha {spreadsheet_id} gravada em {path} ({len(fixture['worksheets'])} abas)")
+    return path